@@ -1,15 +1,46 @@
 import os
+import io
 import csv
-import glob
+import re
 import yaml
 import uuid
+import time
+import hashlib
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
-import cv2  # Import OpenCV for video FPS detection
-from iframe_video_processor import IFrameVideoProcessor  # Import I-frame processor
+from time_utils import time_to_seconds
+try:
+    import orjson  # Optional: much faster JSON encoding for large annotation lists
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        option = 0
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+if orjson is not None:
+    # jsonify() and request.json then use orjson for every endpoint
+    app.json = OrjsonProvider(app)
+# Let a fronting nginx/Apache stream files with sendfile(2) instead of the Python worker
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+# Internal nginx location mapped to ANNOTATION_BASE_DIR, e.g. /_protected/annotations/ (unset = serve from Flask)
+X_ACCEL_ANNOTATIONS_PREFIX = os.environ.get('X_ACCEL_ANNOTATIONS_PREFIX', '')
 
 # Configuration
 VIDEO_BASE_DIR = os.path.join(app.static_folder, "videos")
@@ -17,6 +48,43 @@ ANNOTATION_BASE_DIR = os.path.join("data", "annotations")
 CONFIG_FILE = "config.yaml"
 DEFAULT_FPS = 30  # Default FPS if detection fails
 DEFAULT_CANONICAL_FPS = 30  # Default canonical FPS
+CSV_READ_BUFFER_SIZE = 1 << 16  # 64 KiB; larger buffers measured no faster
+ANNOTATION_SNAPSHOTS_KEEP = int(os.environ.get('ANNOTATION_SNAPSHOTS_KEEP', 20))  # 0 keeps every snapshot
+SAVE_COALESCE_SECONDS = float(os.environ.get('SAVE_COALESCE_SECONDS', 2.0))  # Saves within this window reuse one snapshot
+PREPROCESS_WORKERS = int(os.environ.get('PREPROCESS_WORKERS', min(4, os.cpu_count() or 1)))  # Videos preprocessed concurrently
+FRAME_CACHE_MAX_AGE = int(os.environ.get('FRAME_CACHE_MAX_AGE', 3600))  # Seconds browsers reuse frame images without revalidating
+
+# Directory listing caches, invalidated when the directory mtime changes
+_listing_lock = threading.Lock()
+_video_ids_cache = {}  # VIDEO_BASE_DIR -> (mtime_ns, sorted video IDs)
+
+# Background threads that warm the frame listing cache for variants not yet viewed
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='frames-prefetch')
+
+# Most recent snapshot written per video, used to coalesce rapid repeated saves
+_save_lock = threading.Lock()
+_recent_saves = {}  # video_id -> (monotonic creation time, filename)
+_saved_digests = {}  # video_id -> ((path, mtime_ns, size) of latest snapshot, digest of its bytes)
+
+# Parsed latest snapshot per video, reused while the file's path, mtime and size are unchanged
+_annotations_lock = threading.Lock()
+_annotations_cache = {}  # video_id -> ((path, mtime_ns, size), annotations)
+
+# libyaml's C parser when PyYAML was built with it, else the pure-Python safe loader
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Column order of annotation CSVs written by this app
+ANNOTATION_CSV_HEADER = ('id', 'start_frame', 'end_frame', 'event_type', 'notes')
+
+# Columns a modern-format annotation CSV must contain (an 'id' column is optional)
+ANNOTATION_REQUIRED_FIELDS = frozenset(('start_frame', 'end_frame', 'event_type', 'notes'))
+
+# Trailing frame number in names like frame_0042.jpg
+_FRAME_NUMBER_RE = re.compile(r'(\d+)\.[^.]+$')
+
+# Frame image extensions, split by length so a name needs at most two slice lookups
+_FRAME_EXT4 = frozenset(('.jpg', '.png'))
+_FRAME_EXT5 = frozenset(('.jpeg',))
 
 @app.before_request
 def ensure_directories():
@@ -24,20 +92,92 @@ def ensure_directories():
     os.makedirs(VIDEO_BASE_DIR, exist_ok=True)
     os.makedirs(ANNOTATION_BASE_DIR, exist_ok=True)
 
+@app.after_request
+def cache_frame_images(response):
+    """Let browsers reuse extracted frame images instead of revalidating each one on every seek"""
+    # Not immutable: re-running preprocessing rewrites frames under the same names, so the
+    # ETag/Last-Modified that send_static_file already sets still cover revalidation after expiry
+    path = request.path
+    if path.startswith('/static/videos/') and '/frames/' in path and response.status_code in (200, 304):
+        response.headers['Cache-Control'] = f'public, max-age={FRAME_CACHE_MAX_AGE}'
+    return response
+
 # Load configuration from YAML file
 def load_config():
     """Load configuration from YAML file"""
     if os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, 'r') as file:
-            return yaml.safe_load(file)
+            return yaml.load(file, Loader=YAML_LOADER)
     return {"default_canonical_fps": DEFAULT_CANONICAL_FPS, "videos": []}
 
-# Global config
-config = load_config()
+# Helper function to build the per-video lookup tables for a parsed config
+def build_config_index(config):
+    """Index video entries by ID and precompute their variants, groups and canonical FPS"""
+    by_id = {}
+    for video in config.get('videos', []):
+        by_id.setdefault(video.get('id'), video)  # The first entry wins on duplicate IDs
+    
+    default_fps = config.get('default_canonical_fps', DEFAULT_CANONICAL_FPS)
+    canonical_fps = {video_id: parse_canonical_fps(video, default_fps) for video_id, video in by_id.items()}
+    return {
+        'by_id': by_id,
+        'variants': {video_id: build_config_variants(video) for video_id, video in by_id.items()},
+        'variant_groups': {video_id: build_config_variant_groups(video) for video_id, video in by_id.items()},
+        'canonical_fps': canonical_fps,
+        'clip_starts': {video_id: build_clip_start_frames(video, canonical_fps[video_id])
+                        for video_id, video in by_id.items()},
+        'default_canonical_fps': default_fps
+    }
+
+# Helper function to reload the config when config.yaml changes
+def refresh_config():
+    """Re-read config.yaml and rebuild the lookup tables if its mtime changed since the last load"""
+    global config, config_index, _config_mtime
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime == _config_mtime:
+        return
+    
+    with _config_lock:
+        if mtime == _config_mtime:
+            return
+        try:
+            new_config = load_config() or {}
+            new_index = build_config_index(new_config)
+        except Exception as e:
+            # Keep serving the last good config rather than failing every request
+            print(f"Error reloading config: {e}")
+            if config is not None:
+                _config_mtime = mtime  # Don't re-parse the same broken file on every request
+                return
+            new_config = {"default_canonical_fps": DEFAULT_CANONICAL_FPS, "videos": []}
+            new_index = build_config_index(new_config)
+        config, config_index, _config_mtime = new_config, new_index, mtime
+
+# Global config, reloaded by refresh_config() before each request when config.yaml changes
+_config_lock = threading.Lock()
+_config_mtime = -1  # Sentinel that never matches a real mtime or a missing file
+config = None
+config_index = None
 
-# Function to detect video FPS
-def detect_video_fps(video_path):
+@app.before_request
+def refresh_config_before_request():
+    """Pick up config.yaml edits without restarting the server"""
+    refresh_config()
+
+# Helper function to look up a video's config entry
+def get_video_config(video_id):
+    """Return the config entry for a video, or None if it is not configured"""
+    return config_index['by_id'].get(video_id)
+
+# Function to detect video FPS; opening a capture parses the container and sets up
+# a decoder, so results are memoized per file version (mtime and size)
+@functools.lru_cache(maxsize=256)
+def detect_video_fps(video_path, mtime_ns, size):
     """Detect the FPS of a video file using OpenCV"""
+    import cv2  # Deferred: OpenCV is heavy to load and most variants name their FPS
     try:
         video = cv2.VideoCapture(video_path)
         if not video.isOpened():
@@ -56,40 +196,24 @@ def detect_video_fps(video_path):
         print(f"Error detecting video FPS: {e}")
         return DEFAULT_FPS
 
-# Function to parse time string to seconds
-def time_to_seconds(time_str):
-    """Convert time string (HH:MM:SS.S) to seconds"""
-    try:
-        # Split by : and .
-        parts = time_str.split(':')
-        seconds_parts = parts[-1].split('.')
-        
-        hours = int(parts[0]) if len(parts) > 2 else 0
-        minutes = int(parts[-2] if len(parts) > 1 else parts[0])
-        seconds = int(seconds_parts[0])
-        milliseconds = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
-        
-        total_seconds = hours * 3600 + minutes * 60 + seconds + milliseconds / 10
-        return total_seconds
-    except Exception as e:
-        print(f"Error parsing time string '{time_str}': {e}")
-        return 0
-
 # Function to compute frame offset for clip variants
 def get_clip_start_frame(video_id, clip_name):
     """Get the start frame (in canonical timeline) for a clip"""
-    canonical_fps = get_canonical_fps(video_id)
-    
-    # Find clip in config
-    for video in config.get('videos', []):
-        if video.get('id') == video_id:
-            for clip in video.get('clips', []):
-                if clip.get('name') == clip_name:
-                    start_time = clip.get('start')
-                    if start_time:
-                        start_seconds = time_to_seconds(start_time)
-                        return round(start_seconds * canonical_fps)
-    return 0  # Default to 0 for full video or if clip not found
+    # Default to 0 for full video or if clip not found
+    return config_index['clip_starts'].get(video_id, {}).get(clip_name, 0)
+
+# Helper function to compute every clip's start frame for a config entry
+def build_clip_start_frames(video, canonical_fps):
+    """Map each clip name to its start frame on the canonical timeline"""
+    clip_starts = {}
+    for clip in video.get('clips', []):
+        clip_name = clip.get('name')
+        start_time = clip.get('start')
+        # The first clip with a start time wins, as the old per-request search did
+        if start_time and clip_name not in clip_starts:
+            start_seconds = time_to_seconds(start_time)
+            clip_starts[clip_name] = round(start_seconds * canonical_fps)
+    return clip_starts
 
 @app.route('/')
 def index():
@@ -112,9 +236,12 @@ def annotate_video(video_id):
     # Get list of available videos for dropdown
     video_ids = get_available_video_ids()
     
-    # Check if the video ID exists
+    # Check if the video ID exists; one listing answers every file check below
     video_path = os.path.join(VIDEO_BASE_DIR, video_id)
-    if not os.path.exists(video_path):
+    try:
+        with os.scandir(video_path) as entries:
+            video_dir_names = {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
         return render_template('error.html', message=f"Video ID '{video_id}' not found. Please check the ID or add this video.")
     
     # Get available variants and default to canonical
@@ -122,32 +249,30 @@ def annotate_video(video_id):
     variant = request.args.get('variant', get_canonical_variant(video_id))
     
     # Check if video file exists for the selected variant
-    variant_video_file = os.path.join(video_path, f"{video_id}__{variant}.mp4")
-    if not os.path.exists(variant_video_file):
+    video_name = f"{video_id}__{variant}.mp4"
+    if video_name not in video_dir_names:
         # Try fallback to video.mp4 for backward compatibility
-        variant_video_file = os.path.join(video_path, "video.mp4")
-        if not os.path.exists(variant_video_file):
+        video_name = "video.mp4"
+        if video_name not in video_dir_names:
             return render_template('error.html', message=f"Video file not found for '{video_id}' variant '{variant}'. Please ensure video files exist.")
     
     # Get variant FPS
     variant_fps = get_variant_fps(video_id, variant)
     
-    # Get list of frame images from frames directory for the variant
+    # Get list of frame images from frames directory for the variant, sorted by frame number
+    frames_subdir = f"frames/{variant}/"
     frames_path = os.path.join(video_path, "frames", variant)
-    
-    # Check if frames directory exists
-    if not os.path.exists(frames_path):
+    try:
+        frames, frame_sequence = scan_frames_dir(frames_path)
+    except FileNotFoundError:
         # Try fallback to legacy path for backward compatibility
-        legacy_frames_path = os.path.join(video_path, "frames")
-        if os.path.exists(legacy_frames_path):
-            frames_path = legacy_frames_path
-        else:
+        if "frames" not in video_dir_names:
             return render_template('error.html', 
                                 message=f"Frames directory not found for '{video_id}' variant '{variant}'. Please extract frames first.",
                                 video_id=video_id)
-    
-    # Get list of frames sorted by frame number
-    frames = sorted([f for f in os.listdir(frames_path) if f.endswith(('.jpg', '.jpeg', '.png'))])
+        frames_subdir = "frames/"
+        frames_path = os.path.join(video_path, "frames")
+        frames, frame_sequence = scan_frames_dir(frames_path)
     
     # If no frames found, return error
     if not frames:
@@ -155,19 +280,15 @@ def annotate_video(video_id):
                               message=f"No frame images found for '{video_id}' variant '{variant}'. Please extract frames from the video first.",
                               video_id=video_id)
     
+    # Warm the listing cache for the other variants users are likely to switch to next
+    prefetch_frame_listings(video_path, [v for v in variants if v != variant])
+    
     # Get the latest annotations for this video
     annotations = load_latest_annotation(video_id)
     
-    # Create relative paths for templates
-    video_url = f"videos/{video_id}/{video_id}__{variant}.mp4"
-    # Fall back to legacy path if needed
-    if not os.path.exists(os.path.join(app.static_folder, video_url)):
-        video_url = f"videos/{video_id}/video.mp4"
-    
-    frames_relative_path = f"videos/{video_id}/frames/{variant}/"
-    # Fall back to legacy path if needed
-    if not os.path.exists(os.path.join(app.static_folder, frames_relative_path.strip('/'))):
-        frames_relative_path = f"videos/{video_id}/frames/"
+    # Create relative paths for templates from the files resolved above (no second stat)
+    video_url = f"videos/{video_id}/{video_name}"
+    frames_relative_path = f"videos/{video_id}/{frames_subdir}"
     
     # Get canonical FPS for timeline mapping
     canonical_fps = get_canonical_fps(video_id)
@@ -191,7 +312,9 @@ def annotate_video(video_id):
                           video_ids=video_ids,
                           current_video_id=video_id,
                           video_file=video_url, 
-                          frames=frames, 
+                          frames=None if frame_sequence else frames, 
+                          frame_count=len(frames),
+                          frame_sequence=frame_sequence,
                           frames_path=frames_relative_path,
                           fps=variant_fps,
                           canonical_fps=canonical_fps,
@@ -209,30 +332,50 @@ def save_annotations(video_id):
         data = request.json
         annotations = data.get('annotations', [])
         
-        # Create timestamp for filename
-        timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        csv_data = annotations_to_csv(annotations)
         
         # Ensure video directory exists
         video_ann_dir = os.path.join(ANNOTATION_BASE_DIR, video_id)
         os.makedirs(video_ann_dir, exist_ok=True)
         
-        # Create filename with timestamp
-        filename = f"annotations_{timestamp}.csv"
-        csv_path = os.path.join(video_ann_dir, filename)
+        digest = hashlib.blake2b(csv_data, digest_size=16).digest()
         
-        # Write annotations to CSV
-        with open(csv_path, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['id', 'start_frame', 'end_frame', 'event_type', 'notes'])  # Header
+        with _save_lock:
+            # Nothing to write if the latest snapshot already holds exactly these bytes
+            latest_file = get_latest_annotation_file(video_id)
+            if latest_file and annotation_file_digest(video_id, latest_file) == digest:
+                return jsonify({
+                    'status': 'success',
+                    'message': 'Annotations unchanged',
+                    'filename': os.path.basename(latest_file),
+                    'unchanged': True
+                })
+            
+            # Overwrite the snapshot from a save moments ago instead of creating another file,
+            # but only while it is still the latest one; another worker process or an upload
+            # may have written a newer snapshot that this save must not hide behind
+            now = time.monotonic()
+            recent = _recent_saves.get(video_id)
+            if (recent and now - recent[0] < SAVE_COALESCE_SECONDS
+                    and latest_file == os.path.join(video_ann_dir, recent[1])):
+                filename = recent[1]
+            else:
+                # Create filename with timestamp
+                timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+                filename = f"annotations_{timestamp}.csv"
+                recent = (now, filename)
             
-            for annotation in annotations:
-                writer.writerow([
-                    annotation.get('id', ''),
-                    annotation['start'],
-                    annotation['end'],
-                    annotation['type'],
-                    annotation['notes']
-                ])
+            # Write annotations to CSV
+            csv_path = os.path.join(video_ann_dir, filename)
+            write_annotation_file(csv_path, csv_data)
+            _recent_saves[video_id] = recent
+            stat = os.stat(csv_path)
+            _saved_digests[video_id] = ((csv_path, stat.st_mtime_ns, stat.st_size), digest)
+        
+        with _annotations_lock:
+            _annotations_cache.pop(video_id, None)
+        
+        prune_annotation_snapshots(video_ann_dir)
         
         return jsonify({
             'status': 'success', 
@@ -246,8 +389,24 @@ def save_annotations(video_id):
 @app.route('/load_annotations/<video_id>', methods=['GET'])
 def get_annotations(video_id):
     """API endpoint to get the latest annotations for a video"""
-    annotations = load_latest_annotation(video_id)
-    return jsonify({'status': 'success', 'annotations': annotations})
+    latest_file = get_latest_annotation_file(video_id)
+    if not latest_file:
+        return jsonify({'status': 'success', 'annotations': []})
+    
+    try:
+        stat = os.stat(latest_file)
+    except FileNotFoundError:
+        # Pruned between listing and stat; fall back to an uncached response
+        return jsonify({'status': 'success', 'annotations': load_latest_annotation(video_id)})
+    
+    # Skip parsing entirely when the client already holds this snapshot
+    etag = f"{stat.st_mtime_ns}-{stat.st_size}"
+    if request.if_none_match.contains_weak(etag):
+        return '', 304
+    
+    response = jsonify({'status': 'success', 'annotations': load_annotation_snapshot(video_id, latest_file)})
+    response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/load_annotations/<video_id>', methods=['POST'])
 def load_annotations(video_id):
@@ -263,6 +422,13 @@ def load_annotations(video_id):
         if not file.filename.endswith('.csv'):
             return jsonify({'status': 'error', 'message': 'File must be a CSV'}), 400
         
+        # Read the upload once; the same bytes are parsed and persisted
+        raw = file.read()
+        if not raw:
+            return jsonify({'status': 'error', 'message': 'Empty CSV file'}), 400
+        
+        annotations = parse_annotation_csv(io.StringIO(raw.decode('utf-8-sig'), newline=''))
+        
         # Create timestamp for filename
         timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
         
@@ -273,10 +439,15 @@ def load_annotations(video_id):
         # Save the uploaded file with a timestamp
         filename = f"annotations_{timestamp}.csv"
         file_path = os.path.join(video_ann_dir, filename)
-        file.save(file_path)
+        write_annotation_file(file_path, raw)
         
-        # Read the saved file to return its contents
-        annotations = parse_annotation_file(file_path)
+        # The upload is now the latest snapshot; later saves must not fold into an older one
+        with _save_lock:
+            _recent_saves.pop(video_id, None)
+            _saved_digests.pop(video_id, None)
+        with _annotations_lock:
+            _annotations_cache.pop(video_id, None)
+        prune_annotation_snapshots(video_ann_dir)
         
         return jsonify({'status': 'success', 'annotations': annotations, 'filename': filename})
     
@@ -288,9 +459,18 @@ def download_annotations(video_id):
     """Download the latest annotations CSV for a specific video"""
     annotation_file = get_latest_annotation_file(video_id)
     
-    if annotation_file:
+    if annotation_file and X_ACCEL_ANNOTATIONS_PREFIX:
+        # Hand the transfer to nginx, which streams the file with sendfile(2)
+        relative_path = os.path.relpath(annotation_file, ANNOTATION_BASE_DIR).replace(os.sep, '/')
+        response = app.response_class(mimetype='text/csv')
+        response.headers['X-Accel-Redirect'] = X_ACCEL_ANNOTATIONS_PREFIX.rstrip('/') + '/' + relative_path
+        response.headers['Content-Disposition'] = f'attachment; filename="{video_id}_annotations.csv"'
+        return response
+    elif annotation_file:
+        # max_age=0 makes browsers revalidate, so a repeat download of an unchanged file is a 304
         return send_file(annotation_file, as_attachment=True, 
-                        download_name=f"{video_id}_annotations.csv")
+                        download_name=f"{video_id}_annotations.csv",
+                        conditional=True, etag=True, max_age=0)
     else:
         return jsonify({'status': 'error', 'message': 'No annotations file found'}), 404
 
@@ -322,11 +502,7 @@ def preprocess_video_route(video_id):
     """Route to trigger I-frame preprocessing for a video"""
     try:
         # Find video config
-        video_config = None
-        for video in config.get('videos', []):
-            if video.get('id') == video_id:
-                video_config = video
-                break
+        video_config = get_video_config(video_id)
         
         if not video_config:
             return jsonify({
@@ -343,6 +519,7 @@ def preprocess_video_route(video_id):
             }), 404
         
         # Create processor and process video
+        from iframe_video_processor import IFrameVideoProcessor  # Deferred: pulls in OpenCV
         processor = IFrameVideoProcessor(config)
         output_dir = os.path.join("static", "videos", video_id)
         
@@ -376,17 +553,33 @@ def preprocess_video_route(video_id):
 def preprocess_all_route():
     """Route to trigger I-frame preprocessing for all videos in config"""
     try:
-        processor = IFrameVideoProcessor(config)
+        from iframe_video_processor import IFrameVideoProcessor  # Deferred: pulls in OpenCV
         results = {}
         successful = 0
         failed = 0
         
-        for video_config in config.get('videos', []):
-            video_id = video_config.get('id')
+        # Each video is dominated by ffmpeg subprocesses, so a few threads overlap them well;
+        # the processor keeps no per-video state and every video writes to its own directory
+        video_configs_to_process = config.get('videos', [])
+        workers = max(1, min(PREPROCESS_WORKERS, len(video_configs_to_process)))
+        # Split the cores between the concurrent videos' ffmpeg encodes and thumbnail pools
+        processor = IFrameVideoProcessor(config, ffmpeg_threads=max(1, (os.cpu_count() or 1) // workers))
+        
+        def process_video(video_config):
+            output_dir = os.path.join("static", "videos", video_config.get('id'))
+            return processor.process_video_with_iframe_preprocessing(video_config, output_dir)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process_video, video_config)
+                       for video_config in video_configs_to_process]
+        
+        # Collect in config order so the response is stable regardless of completion order
+        for index, (video_config, future) in enumerate(zip(video_configs_to_process, futures)):
+            # Entries without an id are reported by position; a None key would break the JSON response
+            video_id = video_config.get('id') or f"videos[{index}]"
             
             try:
-                output_dir = os.path.join("static", "videos", video_id)
-                video_results = processor.process_video_with_iframe_preprocessing(video_config, output_dir)
+                video_results = future.result()
                 
                 if video_results['success']:
                     successful += 1
@@ -421,29 +614,193 @@ def preprocess_all_route():
 # Helper function to get available video IDs
 def get_available_video_ids():
     """Return a list of available video IDs (directories in the videos folder)"""
-    if not os.path.exists(VIDEO_BASE_DIR):
+    try:
+        mtime = os.stat(VIDEO_BASE_DIR).st_mtime_ns
+    except FileNotFoundError:
         return []
     
+    with _listing_lock:
+        cached = _video_ids_cache.get(VIDEO_BASE_DIR)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
     # Get directories in the videos folder
-    return sorted([d for d in os.listdir(VIDEO_BASE_DIR) 
-                 if os.path.isdir(os.path.join(VIDEO_BASE_DIR, d))])
+    with os.scandir(VIDEO_BASE_DIR) as entries:
+        video_ids = sorted(e.name for e in entries if e.is_dir())
+    
+    with _listing_lock:
+        _video_ids_cache[VIDEO_BASE_DIR] = (mtime, video_ids)
+    return video_ids
+
+# Helper function to scan and cache a frames directory
+def scan_frames_dir(frames_path):
+    """Return (sorted frame names, frame sequence) for a directory, cached on its mtime"""
+    # The mtime is part of the cache key, so adding or removing frames forces a rescan
+    return _scan_frames_dir(frames_path, os.stat(frames_path).st_mtime_ns)
+
+# Bounded so stale (path, old mtime) entries age out instead of accumulating
+@functools.lru_cache(maxsize=64)
+def _scan_frames_dir(frames_path, mtime_ns):
+    """Scan a frames directory; callers must not mutate the cached results"""
+    with os.scandir(frames_path) as entries:
+        names = [e.name for e in entries
+                 if is_frame_image(e.name) and e.is_file()]
+    
+    # Sort by frame number so frame_10000.jpg follows frame_9999.jpg; ints compare
+    # cheaper than full names, which only break ties
+    keyed = []
+    for name in names:
+        match = _FRAME_NUMBER_RE.search(name)
+        keyed.append((int(match.group(1)) if match else -1, name))
+    keyed.sort()
+    frames = [name for _, name in keyed]
+    return frames, detect_frame_sequence(frames)
+
+# Helper function to scan frame directories in the background
+def prefetch_frame_listings(video_path, variants):
+    """Queue cache-warming scans of the frames directories for the given variants"""
+    for variant in variants:
+        _prefetch_pool.submit(prefetch_frame_listing, os.path.join(video_path, "frames", variant))
+
+# Helper function to scan one frames directory, ignoring variants without frames
+def prefetch_frame_listing(frames_path):
+    """Populate the frame listing cache for a directory if it exists"""
+    try:
+        scan_frames_dir(frames_path)
+    except OSError:
+        pass
+
+# Helper function to check whether a file name is a frame image
+def is_frame_image(name):
+    """Return True for .jpg, .jpeg and .png names (case-insensitive)"""
+    return name[-4:].lower() in _FRAME_EXT4 or name[-5:].lower() in _FRAME_EXT5
+
+# Helper function to detect contiguous, uniformly named frames
+def detect_frame_sequence(frames):
+    """
+    Detect names like frame_0000.jpg, frame_0001.jpg, ... with no gaps
+    
+    Returns a dict with prefix, suffix, zero-padding width, start number and count
+    so clients can build every frame name themselves, or None if any name deviates.
+    """
+    if not frames:
+        return None
+    
+    match = _FRAME_NUMBER_RE.search(frames[0])
+    if not match:
+        return None
+    
+    prefix = frames[0][:match.start(1)]
+    suffix = frames[0][match.end(1):]
+    width = len(match.group(1))
+    start = int(match.group(1))
+    
+    for offset, name in enumerate(frames):
+        if name != f"{prefix}{start + offset:0{width}d}{suffix}":
+            return None
+    
+    return {'prefix': prefix, 'suffix': suffix, 'width': width, 'start': start, 'count': len(frames)}
 
 # Helper function to get the latest annotation file path
 def get_latest_annotation_file(video_id):
     """Find the latest annotation file for a video based on filename timestamp"""
     video_ann_dir = os.path.join(ANNOTATION_BASE_DIR, video_id)
     
-    if not os.path.exists(video_ann_dir):
+    # Names embed a YYYYMMDDTHHMMSS timestamp, so the lexicographic maximum is the
+    # newest snapshot and no per-file stat() is needed
+    try:
+        with os.scandir(video_ann_dir) as entries:
+            latest_name = max((entry.name for entry in entries
+                               if entry.name.startswith('annotations_') and entry.name.endswith('.csv')),
+                              default=None)
+    except FileNotFoundError:
+        return None
+    
+    return os.path.join(video_ann_dir, latest_name) if latest_name else None
+
+# Helper function to serialize annotations to CSV
+def annotations_to_csv(annotations):
+    """Render annotations as CSV bytes in memory so they can be written in one call"""
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    writer.writerow(ANNOTATION_CSV_HEADER)
+    writer.writerows((
+        annotation.get('id', ''),
+        annotation['start'],
+        annotation['end'],
+        annotation['type'],
+        annotation['notes']
+    ) for annotation in annotations)
+    return buffer.getvalue().encode('utf-8')
+
+# Helper function to write an annotation file
+def write_annotation_file(csv_path, data):
+    """Write annotation CSV bytes atomically so readers never see a partial file"""
+    # Unique per writer thread; the .tmp suffix keeps it out of the annotations_*.csv listings
+    tmp_path = f"{csv_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as csvfile:
+            csvfile.write(data)
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
+        os.replace(tmp_path, csv_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    
+    # Persist the rename itself; directories cannot be opened this way on Windows
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(os.path.dirname(csv_path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+# Helper function to get the digest of the latest annotation snapshot
+def annotation_file_digest(video_id, csv_path):
+    """Return the digest of a snapshot's bytes, hashing the file only when it changed"""
+    # Keyed on mtime and size too, since another worker process may rewrite the same file
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
         return None
+    key = (csv_path, stat.st_mtime_ns, stat.st_size)
     
-    # Find all annotation files
-    files = glob.glob(os.path.join(video_ann_dir, "annotations_*.csv"))
+    cached = _saved_digests.get(video_id)
+    if cached and cached[0] == key:
+        return cached[1]
     
-    if not files:
+    try:
+        with open(csv_path, 'rb') as csvfile:
+            digest = hashlib.blake2b(csvfile.read(), digest_size=16).digest()
+    except OSError:
         return None
     
-    # Return the most recent file (by modification time)
-    return max(files, key=os.path.getmtime)
+    _saved_digests[video_id] = (key, digest)
+    return digest
+
+# Helper function to bound the number of stored annotation snapshots
+def prune_annotation_snapshots(video_ann_dir):
+    """Delete all but the newest ANNOTATION_SNAPSHOTS_KEEP annotation files for a video"""
+    if ANNOTATION_SNAPSHOTS_KEEP <= 0:
+        return
+    
+    try:
+        with os.scandir(video_ann_dir) as entries:
+            names = [e.name for e in entries if e.name.startswith('annotations_') and e.name.endswith('.csv')]
+        
+        if len(names) <= ANNOTATION_SNAPSHOTS_KEEP:
+            return
+        
+        # Fixed-width timestamps in the names sort chronologically, so no stat() is needed
+        names.sort(reverse=True)
+        for name in names[ANNOTATION_SNAPSHOTS_KEEP:]:
+            os.unlink(os.path.join(video_ann_dir, name))
+    except OSError as e:
+        print(f"Error pruning annotation snapshots: {e}")
 
 # Helper function to load the latest annotation
 def load_latest_annotation(video_id):
@@ -453,63 +810,119 @@ def load_latest_annotation(video_id):
     if not latest_file:
         return []
     
-    return parse_annotation_file(latest_file)
+    return load_annotation_snapshot(video_id, latest_file)
+
+# Helper function to parse an annotation snapshot with caching
+def load_annotation_snapshot(video_id, file_path):
+    """Parse an annotation file, reusing the cached result while the file is unchanged"""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return []
+    
+    key = (file_path, stat.st_mtime_ns, stat.st_size)
+    with _annotations_lock:
+        cached = _annotations_cache.get(video_id)
+    if cached and cached[0] == key:
+        return cached[1]  # Shared between requests; callers must not mutate it
+    
+    annotations = parse_annotation_file(file_path)
+    with _annotations_lock:
+        _annotations_cache[video_id] = (key, annotations)
+    return annotations
 
 # Helper function to parse an annotation file
 def parse_annotation_file(file_path):
     """Parse a CSV annotation file with better error handling"""
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', buffering=CSV_READ_BUFFER_SIZE) as csvfile:  # Handle BOM
+            return parse_annotation_csv(csvfile)
+    except Exception as e:
+        print(f"Error parsing annotation file: {e}")
+        return []
+
+# Helper function to parse annotations from an open CSV stream
+def parse_annotation_csv(csvfile):
+    """Parse annotations from a CSV text stream in modern or legacy format in a single pass"""
     annotations = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8-sig') as csvfile:  # Handle BOM
-            reader = csv.DictReader(csvfile)
-            
-            # Validate headers
-            required_fields = {'start_frame', 'end_frame', 'event_type', 'notes'}
-            if reader.fieldnames and not required_fields.issubset(set(reader.fieldnames)):
-                # Try legacy format
-                csvfile.seek(0)
-                reader = csv.reader(csvfile)
-                next(reader, None)  # Skip potential header
-                
-                for row in reader:
-                    if len(row) >= 4 and row[0].isdigit() and row[1].isdigit():
-                        annotations.append({
-                            'id': str(uuid.uuid4()),
-                            'start': int(row[0]),
-                            'end': int(row[1]),
-                            'type': row[2],
-                            'notes': row[3] if len(row) > 3 else ''
-                        })
-            else:
-                # Modern format with headers
-                for row in reader:
-                    annotations.append({
-                        'id': row.get('id', str(uuid.uuid4())),
-                        'start': int(row['start_frame']),
-                        'end': int(row['end_frame']),
-                        'type': row['event_type'],
-                        'notes': row['notes']
-                    })
+        reader = csv.reader(csvfile)
+        first_row = next(reader, None)
+        if first_row is None:
+            return annotations
+        
+        if ANNOTATION_REQUIRED_FIELDS.issubset(first_row):
+            # Modern format with headers; resolve column positions once instead of building
+            # a dict per row. Only files without an id column need generated IDs
+            columns = {name: index for index, name in enumerate(first_row)}
+            id_col = columns.get('id')
+            start_col = columns['start_frame']
+            end_col = columns['end_frame']
+            type_col = columns['event_type']
+            notes_col = columns['notes']
+            for row in reader:
+                if not row:
+                    continue  # DictReader skipped blank lines too
+                annotations.append({
+                    'id': row[id_col] if id_col is not None else str(uuid.uuid4()),
+                    'start': int(row[start_col]),
+                    'end': int(row[end_col]),
+                    'type': row[type_col],
+                    'notes': row[notes_col]
+                })
+        else:
+            # Legacy format: positional columns; a non-numeric first row is its header
+            append_legacy_annotation(annotations, first_row)
+            for row in reader:
+                append_legacy_annotation(annotations, row)
     except Exception as e:
         print(f"Error parsing annotation file: {e}")
         
     return annotations
 
+# Helper function to parse one legacy-format annotation row
+def append_legacy_annotation(annotations, row):
+    """Append a positional start,end,type,notes row, skipping rows that are not annotations"""
+    if len(row) < 4:
+        return
+    # A single int() conversion both validates and parses the frame numbers
+    try:
+        start = int(row[0])
+        end = int(row[1])
+    except ValueError:
+        return
+    annotations.append({
+        'id': str(uuid.uuid4()),
+        'start': start,
+        'end': end,
+        'type': row[2],
+        'notes': row[3]
+    })
+
 # Helper function to load frame timestamps
 def load_frame_timestamps(video_id, variant):
     """Load frame timestamps from JSON file if available"""
     frames_dir = os.path.join(VIDEO_BASE_DIR, video_id, "frames", variant)
     timestamp_file = os.path.join(frames_dir, "frame_timestamps.json")
     
-    if os.path.exists(timestamp_file):
-        try:
-            import json
-            with open(timestamp_file, 'r') as f:
-                data = json.load(f)
-            return data.get('frame_mapping', {})
-        except Exception as e:
-            print(f"Error loading frame timestamps: {e}")
+    try:
+        stat = os.stat(timestamp_file)
+    except OSError:
+        return {}
+    return _load_frame_timestamps(timestamp_file, stat.st_mtime_ns, stat.st_size)
+
+# Timestamp maps are regenerated only by preprocessing, so parse each file version once
+@functools.lru_cache(maxsize=32)
+def _load_frame_timestamps(timestamp_file, mtime_ns, size):
+    """Parse the frame mapping from a timestamps file; callers must not mutate the result"""
+    try:
+        # Parse through the app's JSON provider, which is orjson when installed
+        with open(timestamp_file, 'rb') as f:
+            data = app.json.loads(f.read())
+        return data.get('frame_mapping', {})
+    except Exception as e:
+        print(f"Error loading frame timestamps: {e}")
     
     return {}
 
@@ -523,33 +936,31 @@ def extract_frames(video_id, fps=1):
 # Helper function to get variant information for a video
 def get_variants_for_video(video_id):
     """Get available variants for a video from config"""
-    variants = []
+    # Check in config; the list is precomputed and shared, so callers must not mutate it
+    variants = config_index['variants'].get(video_id)
+    if variants is not None:
+        return variants
     
-    # Check in config
-    for video in config.get('videos', []):
-        if video.get('id') == video_id:
-            # Add full video variants
-            for fps in video.get('fps_variants', []):
-                variants.append(f"full_{fps}")
-            
-            # Add clip variants
-            for clip in video.get('clips', []):
-                clip_name = clip.get('name')
-                for fps in clip.get('fps', []):
-                    variants.append(f"{clip_name}_{fps}")
-            
-            return variants
+    variants = []
     
     # Fallback: Look for variant files in the directory
     video_dir = os.path.join(VIDEO_BASE_DIR, video_id)
-    if os.path.exists(video_dir):
-        for file in os.listdir(video_dir):
-            if file.startswith(f"{video_id}__") and file.endswith(".mp4"):
-                variant = file[len(f"{video_id}__"):-4]  # Extract the variant part
-                variants.append(variant)
+    prefix = f"{video_id}__"
+    prefix_len = len(prefix)
+    has_legacy_video = False
+    try:
+        with os.scandir(video_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(prefix) and name.endswith(".mp4") and entry.is_file():
+                    variants.append(name[prefix_len:-4])  # Extract the variant part
+                elif name == "video.mp4":
+                    has_legacy_video = True
+    except FileNotFoundError:
+        pass
     
     # If no variants found, create a default one
-    if not variants and os.path.exists(os.path.join(video_dir, "video.mp4")):
+    if not variants and has_legacy_video:
         variants.append("full_30")  # Default legacy variant
     
     return variants
@@ -557,38 +968,12 @@ def get_variants_for_video(video_id):
 # Helper function to get the variant groups for the UI dropdown
 def get_variant_groups(video_id):
     """Get variant groups for a video from config"""
-    variant_groups = {}
-    
     # Check in config
-    for video in config.get('videos', []):
-        if video.get('id') == video_id:
-            # Add full video variants
-            full_variants = []
-            for fps in video.get('fps_variants', []):
-                full_variants.append({
-                    'key': f"full_{fps}",
-                    'label': f"{fps} FPS"
-                })
-            
-            if full_variants:
-                variant_groups['Full Video'] = full_variants
-            
-            # Add clip variants
-            for clip in video.get('clips', []):
-                clip_name = clip.get('name')
-                clip_label = clip.get('label', clip_name.replace('_', ' ').title())
-                
-                clip_variants = []
-                for fps in clip.get('fps', []):
-                    clip_variants.append({
-                        'key': f"{clip_name}_{fps}",
-                        'label': f"{fps} FPS"
-                    })
-                
-                if clip_variants:
-                    variant_groups[clip_label] = clip_variants
-            
-            return variant_groups
+    variant_groups = config_index['variant_groups'].get(video_id)
+    if variant_groups is not None:
+        return variant_groups
+    
+    variant_groups = {}
     
     # Fallback: Create a simple group from flat list
     variants = get_variants_for_video(video_id)
@@ -600,23 +985,76 @@ def get_variant_groups(video_id):
 # Helper function to get canonical variant for a video
 def get_canonical_variant(video_id):
     """Get canonical variant for a video from config"""
-    for video in config.get('videos', []):
-        if video.get('id') == video_id:
-            return video.get('canonical_variant', 'full_30')
+    video = get_video_config(video_id)
+    if video:
+        return video.get('canonical_variant', 'full_30')
     return 'full_30'  # Default
 
 # Helper function to get canonical FPS for a video
 def get_canonical_fps(video_id):
     """Get canonical FPS for a video from config"""
-    for video in config.get('videos', []):
-        if video.get('id') == video_id:
-            canonical_variant = video.get('canonical_variant', 'full_30')
-            if canonical_variant.startswith('full_'):
-                try:
-                    return int(canonical_variant.split('_')[1])
-                except (IndexError, ValueError):
-                    pass
-    return config.get('default_canonical_fps', DEFAULT_CANONICAL_FPS)
+    return config_index['canonical_fps'].get(video_id, config_index['default_canonical_fps'])
+
+# Helper function to list the variants a config entry declares
+def build_config_variants(video):
+    """Build the variant keys declared by a video's config entry"""
+    variants = []
+    
+    # Add full video variants
+    for fps in video.get('fps_variants', []):
+        variants.append(f"full_{fps}")
+    
+    # Add clip variants
+    for clip in video.get('clips', []):
+        clip_name = clip.get('name')
+        for fps in clip.get('fps', []):
+            variants.append(f"{clip_name}_{fps}")
+    
+    return variants
+
+# Helper function to group a config entry's variants for the UI dropdown
+def build_config_variant_groups(video):
+    """Build the dropdown groups declared by a video's config entry"""
+    variant_groups = {}
+    
+    # Add full video variants
+    full_variants = []
+    for fps in video.get('fps_variants', []):
+        full_variants.append({
+            'key': f"full_{fps}",
+            'label': f"{fps} FPS"
+        })
+    
+    if full_variants:
+        variant_groups['Full Video'] = full_variants
+    
+    # Add clip variants
+    for clip in video.get('clips', []):
+        clip_name = clip.get('name')
+        clip_label = clip.get('label', clip_name.replace('_', ' ').title())
+        
+        clip_variants = []
+        for fps in clip.get('fps', []):
+            clip_variants.append({
+                'key': f"{clip_name}_{fps}",
+                'label': f"{fps} FPS"
+            })
+        
+        if clip_variants:
+            variant_groups[clip_label] = clip_variants
+    
+    return variant_groups
+
+# Helper function to read the canonical FPS from a config entry
+def parse_canonical_fps(video, default_fps):
+    """Get the FPS encoded in a video's full_<fps> canonical variant, else the default"""
+    canonical_variant = video.get('canonical_variant', 'full_30')
+    if canonical_variant.startswith('full_'):
+        try:
+            return int(canonical_variant.split('_')[1])
+        except (IndexError, ValueError):
+            pass
+    return default_fps
 
 # Helper function to get variant FPS
 def get_variant_fps(video_id, variant):
@@ -627,17 +1065,22 @@ def get_variant_fps(video_id, variant):
         except (IndexError, ValueError):
             pass
     
-    # Fallback: detect from video file
-    variant_video_file = os.path.join(VIDEO_BASE_DIR, video_id, f"{video_id}__{variant}.mp4")
-    if os.path.exists(variant_video_file):
-        return detect_video_fps(variant_video_file)
-    
-    # Legacy fallback
-    legacy_video_file = os.path.join(VIDEO_BASE_DIR, video_id, "video.mp4")
-    if os.path.exists(legacy_video_file):
-        return detect_video_fps(legacy_video_file)
+    # Fallback: detect from the variant video file, then the legacy video.mp4; the single
+    # stat per candidate both checks existence and keys the memoized detection
+    video_dir = os.path.join(VIDEO_BASE_DIR, video_id)
+    for video_file in (os.path.join(video_dir, f"{video_id}__{variant}.mp4"),
+                       os.path.join(video_dir, "video.mp4")):
+        try:
+            stat = os.stat(video_file)
+        except OSError:
+            continue
+        return detect_video_fps(video_file, stat.st_mtime_ns, stat.st_size)
     
     return DEFAULT_FPS
 
+# Load the config at import so scripts and tests see it before the first request
+refresh_config()
+
 if __name__ == '__main__':
+    # Development server only; see "Production Deployment" in README.md for gunicorn
     app.run(debug=True, host='0.0.0.0', port=5001) 
\ No newline at end of file
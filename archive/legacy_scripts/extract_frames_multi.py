@@ -13,19 +13,42 @@ Options:
   --video-path PATH    Path to the video file (default: static/videos/VIDEO_ID/video.mp4)
   --output-dir PATH    Directory to save frames (default: static/videos/VIDEO_ID/frames)
   --fps RATE           Frames per second to extract (default: auto-detect from video)
+  --use-opencv         Decode frames with OpenCV instead of ffmpeg
   --help               Show this help message
 """
 
 import os
 import sys
-import cv2
+import json
 import getopt
+import subprocess
 
 def print_help():
     """Print help message"""
     print(__doc__)
 
-def extract_frames(video_id, video_path=None, output_dir=None, target_fps=None):
+def probe_video(video_path):
+    """Read FPS, frame count and duration from the container headers with ffprobe"""
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=r_frame_rate,nb_frames,duration:format=duration",
+        "-of", "json", video_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        data = json.loads(result.stdout)
+        stream = data["streams"][0]
+        num, _, den = stream["r_frame_rate"].partition("/")
+        fps = float(num) / float(den or 1)
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError, IndexError, ZeroDivisionError):
+        return None
+    
+    # Some containers (e.g. MKV) only report the duration at the format level
+    duration = float(stream.get("duration") or data.get("format", {}).get("duration") or 0)
+    total_frames = int(stream.get("nb_frames") or round(duration * fps))
+    return fps, total_frames, duration
+
+def extract_frames(video_id, video_path=None, output_dir=None, target_fps=None, use_opencv=False):
     """Extract frames from a video at the specified rate"""
     # Set default paths based on video_id if not provided
     if video_path is None:
@@ -37,6 +60,54 @@ def extract_frames(video_id, video_path=None, output_dir=None, target_fps=None):
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
+    if use_opencv:
+        return extract_frames_opencv(video_id, video_path, output_dir, target_fps)
+    
+    # Get video properties without decoding any frames
+    info = probe_video(video_path)
+    if info is None:
+        print(f"Error: Could not open video {video_path}")
+        return False
+    fps, total_frames, duration = info
+    
+    # If target_fps is not specified, use the video's native fps
+    if target_fps is None:
+        target_fps = fps
+        print(f"Auto-detected video FPS: {fps}")
+    
+    print(f"Video ID: {video_id}")
+    print(f"Video path: {video_path}")
+    print(f"Output directory: {output_dir}")
+    print(f"Video FPS: {fps}")
+    print(f"Total frames: {total_frames}")
+    print(f"Duration: {duration:.2f} seconds")
+    print(f"Extracting frames at {target_fps} fps")
+    
+    # ffmpeg drops unwanted frames in its fps filter and encodes the JPEGs on all cores
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", video_path]
+    if target_fps >= fps:
+        # If target fps is higher than video fps, extract every frame
+        if target_fps > fps:
+            print("Warning: Target FPS is higher than video FPS. Extracting every frame.")
+    else:
+        cmd += ["-vf", f"fps={target_fps}"]
+    cmd += ["-q:v", "2", "-start_number", "0", os.path.join(output_dir, "frame_%04d.jpg")]
+    
+    try:
+        subprocess.run(cmd, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error: ffmpeg frame extraction failed: {e}")
+        return False
+    
+    saved_count = sum(1 for name in os.listdir(output_dir)
+                      if name.startswith("frame_") and name.endswith(".jpg"))
+    print(f"Extraction complete. Saved {saved_count} frames to {output_dir}")
+    return True
+
+def extract_frames_opencv(video_id, video_path, output_dir, target_fps=None):
+    """Extract frames by decoding every frame with OpenCV"""
+    import cv2
+    
     # Open the video
     video = cv2.VideoCapture(video_path)
     if not video.isOpened():
@@ -101,10 +172,11 @@ def main():
     video_path = None
     output_dir = None
     target_fps = None  # None means auto-detect
+    use_opencv = False
     
     # Parse command line arguments
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "hi:v:o:f:", ["help", "video-id=", "video-path=", "output-dir=", "fps="])
+        opts, args = getopt.getopt(sys.argv[1:], "hi:v:o:f:", ["help", "video-id=", "video-path=", "output-dir=", "fps=", "use-opencv"])
     except getopt.GetoptError:
         print_help()
         sys.exit(2)
@@ -125,6 +197,8 @@ def main():
             except ValueError:
                 print("Error: FPS must be a number")
                 sys.exit(2)
+        elif opt == "--use-opencv":
+            use_opencv = True
     
     # Check if video_id is provided
     if not video_id:
@@ -133,7 +207,7 @@ def main():
         sys.exit(2)
     
     # Extract frames
-    success = extract_frames(video_id, video_path, output_dir, target_fps)
+    success = extract_frames(video_id, video_path, output_dir, target_fps, use_opencv)
     if not success:
         sys.exit(1)
 
@@ -27,11 +27,11 @@ import os
 import sys
 import getopt
 import yaml
-import glob
 import shutil
+import functools
 from datetime import datetime
 from video_processor import VideoProcessor
-from frame_extractor import FrameExtractor
+from iframe_video_processor import YAML_LOADER
 
 
 def print_help():
@@ -46,8 +46,39 @@ def load_config():
         print(f"Error: Configuration file {config_file} not found")
         return None
     
+    # Reparsed only when the file changes
+    return load_config_file(config_file, os.stat(config_file).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4)
+def load_config_file(config_file, mtime_ns):
+    """Parse one version of a YAML config file"""
     with open(config_file, 'r') as file:
-        return yaml.safe_load(file)
+        return yaml.load(file, Loader=YAML_LOADER)
+
+
+def count_frame_files(frames_dir):
+    """
+    Count extracted frame images with a single directory scan
+    
+    Args:
+        frames_dir: Frames directory for one variant
+        
+    Returns:
+        tuple: (directory exists, number of frame_*.jpg files)
+    """
+    try:
+        with os.scandir(frames_dir) as entries:
+            return True, sum(1 for entry in entries
+                             if entry.name.startswith("frame_") and entry.name.endswith(".jpg"))
+    except (FileNotFoundError, NotADirectoryError):
+        return False, 0
+
+
+def is_legacy_file(name):
+    """Whether a file in a video output directory was left behind by the old scripts"""
+    # fps_info.yaml comes from preprocess_variants.py, *__tmp_*.mp4 from interrupted runs
+    return name == "fps_info.yaml" or ("__tmp_" in name and name.endswith(".mp4"))
 
 
 def analyze_video_processing(video_config):
@@ -79,14 +110,17 @@ def analyze_video_processing(video_config):
     
     output_dir = analysis['output_dir']
     
-    if not os.path.exists(output_dir):
+    # List the output directory once; existence checks below are set lookups, not stats
+    try:
+        with os.scandir(output_dir) as entries:
+            output_files = {entry.name for entry in entries if entry.is_file()}
+    except FileNotFoundError:
         analysis['issues'].append("Output directory does not exist")
         analysis['recommendations'].append("Run preprocess_videos.py to create video variants")
         return analysis
     
     # Check for new processing info file
-    info_file = os.path.join(output_dir, f"{video_id}_processing_info.yaml")
-    analysis['has_processing_info'] = os.path.exists(info_file)
+    analysis['has_processing_info'] = f"{video_id}_processing_info.yaml" in output_files
     
     if not analysis['has_processing_info']:
         analysis['recommendations'].append("Reprocess with unified system to generate processing metadata")
@@ -94,19 +128,21 @@ def analyze_video_processing(video_config):
     # Check full video variants
     for fps in fps_variants:
         variant_key = f"full_{fps}"
-        variant_path = os.path.join(output_dir, f"{video_id}__{variant_key}.mp4")
         frames_dir = os.path.join(output_dir, "frames", variant_key)
         
+        video_exists = f"{video_id}__{variant_key}.mp4" in output_files
+        frames_exist, frame_count = count_frame_files(frames_dir)
+        
         analysis['full_variants'][variant_key] = {
-            'video_exists': os.path.exists(variant_path),
-            'frames_exist': os.path.exists(frames_dir),
-            'frame_count': len(glob.glob(os.path.join(frames_dir, "frame_*.jpg"))) if os.path.exists(frames_dir) else 0
+            'video_exists': video_exists,
+            'frames_exist': frames_exist,
+            'frame_count': frame_count
         }
         
-        if not os.path.exists(variant_path):
+        if not video_exists:
             analysis['issues'].append(f"Missing video variant: {variant_key}")
         
-        if not os.path.exists(frames_dir):
+        if not frames_exist:
             analysis['issues'].append(f"Missing frames directory: {variant_key}")
     
     # Check clip variants
@@ -116,50 +152,43 @@ def analyze_video_processing(video_config):
         
         for fps in fps_list:
             variant_key = f"{clip_name}_{fps}"
-            variant_path = os.path.join(output_dir, f"{video_id}__{variant_key}.mp4")
             frames_dir = os.path.join(output_dir, "frames", variant_key)
             
+            video_exists = f"{video_id}__{variant_key}.mp4" in output_files
+            frames_exist, frame_count = count_frame_files(frames_dir)
+            
             analysis['clip_variants'][variant_key] = {
-                'video_exists': os.path.exists(variant_path),
-                'frames_exist': os.path.exists(frames_dir),
-                'frame_count': len(glob.glob(os.path.join(frames_dir, "frame_*.jpg"))) if os.path.exists(frames_dir) else 0
+                'video_exists': video_exists,
+                'frames_exist': frames_exist,
+                'frame_count': frame_count
             }
             
-            if not os.path.exists(variant_path):
+            if not video_exists:
                 analysis['issues'].append(f"Missing clip variant: {variant_key}")
             
-            if not os.path.exists(frames_dir):
+            if not frames_exist:
                 analysis['issues'].append(f"Missing frames directory: {variant_key}")
     
     # Check for legacy files
-    legacy_files = []
-    
-    # Check for old fps_info.yaml (from preprocess_variants.py)
-    old_fps_info = os.path.join(output_dir, "fps_info.yaml")
-    if os.path.exists(old_fps_info):
-        legacy_files.append(old_fps_info)
-    
-    # Check for any temporary files
-    temp_files = glob.glob(os.path.join(output_dir, "*__tmp_*.mp4"))
-    legacy_files.extend(temp_files)
+    legacy_files = [os.path.join(output_dir, name) for name in sorted(output_files) if is_legacy_file(name)]
     
     if legacy_files:
         analysis['legacy_files'] = legacy_files
         analysis['recommendations'].append("Clean up legacy files after migration")
     
     # Frame analysis recommendations
-    processor = VideoProcessor()
-    extractor = FrameExtractor()
-    
     try:
         if analysis['source_exists']:
-            source_duration = processor.get_video_duration(source_video)
+            # Probe the source once and derive every variant's expected frame count from it
+            source_duration = VideoProcessor().get_video_duration(source_video)
+            expected_map = {fps: int(source_duration * fps) for fps in fps_variants}
             
             # Check frame counts for accuracy
-            for variant_key, variant_info in analysis['full_variants'].items():
+            for fps in fps_variants:
+                variant_key = f"full_{fps}"
+                variant_info = analysis['full_variants'][variant_key]
                 if variant_info['frames_exist'] and variant_info['frame_count'] > 0:
-                    target_fps = int(variant_key.split('_')[1])
-                    expected_frames = int(source_duration * target_fps)
+                    expected_frames = expected_map[fps]
                     actual_frames = variant_info['frame_count']
                     
                     # Check for duplicate frame indicators (too many frames)
@@ -17,15 +17,19 @@ Options:
 import os
 import sys
 import yaml
+import functools
 import getopt
 import subprocess
-import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 CONFIG_FILE = "config.yaml"
 VIDEO_BASE_DIR = "static/videos"
 DEFAULT_CANONICAL_FPS = 60
 
+# libyaml's C parser when PyYAML was built with it, else the pure-Python safe loader
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 def print_help():
     """Print help message"""
     print(__doc__)
@@ -33,88 +37,51 @@ def print_help():
 def load_config():
     """Load configuration from YAML file"""
     if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as file:
-            return yaml.safe_load(file)
+        # Reparsed only when the file changes
+        return load_config_file(CONFIG_FILE, os.stat(CONFIG_FILE).st_mtime_ns)
     return {"default_canonical_fps": DEFAULT_CANONICAL_FPS, "videos": []}
 
-def time_to_seconds(time_str):
-    """Convert time string (HH:MM:SS.S) to seconds"""
-    try:
-        # Split by : and .
-        parts = time_str.split(':')
-        seconds_parts = parts[-1].split('.')
-        
-        hours = int(parts[0]) if len(parts) > 2 else 0
-        minutes = int(parts[-2] if len(parts) > 1 else parts[0])
-        seconds = int(seconds_parts[0])
-        milliseconds = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
-        
-        total_seconds = hours * 3600 + minutes * 60 + seconds + milliseconds / 10
-        return total_seconds
-    except Exception as e:
-        print(f"Error parsing time string '{time_str}': {e}")
-        return 0
+@functools.lru_cache(maxsize=4)
+def load_config_file(config_file, mtime_ns):
+    """Parse one version of a YAML config file"""
+    with open(config_file, 'r') as file:
+        return yaml.load(file, Loader=YAML_LOADER)
 
 def process_clip(video_id, source_path, clip_name, start_time, end_time, fps_list, output_base_dir):
     """Process a clip at different FPS values"""
     print(f"Processing clip '{clip_name}' from {start_time} to {end_time}")
     
-    # Create temporary file for highest FPS extraction
-    tmp_clip_path = os.path.join(output_base_dir, f"{video_id}__tmp_clip.mp4")
+    # Decode the source once and fan it out to every FPS: each branch feeds both
+    # the variant video and its frame images, so nothing is re-decoded from disk
+    branches = "".join(f"[s{i}]" for i in range(len(fps_list)))
+    graph = [f"[0:v]split={len(fps_list)}{branches}"]
+    for i, fps in enumerate(fps_list):
+        graph.append(f"[s{i}]fps={fps},split=2[v{i}][f{i}]")
     
-    # Get the highest FPS in the list for initial extraction
-    max_fps = max(fps_list)
-    
-    # Extract clip once at highest fps in the list
-    extract_cmd = [
+    # Seeking on the input jumps straight to the nearest keyframe instead of decoding the
+    # whole prefix; since every output is re-encoded, ffmpeg still trims to the exact frame
+    cmd = [
         "ffmpeg", "-y",  # Overwrite output files without asking
-        "-i", source_path,
         "-ss", start_time,
         "-to", end_time,
-        "-r", str(max_fps),
-        tmp_clip_path
+        "-i", source_path,
+        "-filter_complex", ";".join(graph)
     ]
     
-    print(f"Extracting clip at {max_fps} FPS: {' '.join(extract_cmd)}")
-    subprocess.run(extract_cmd)
-    
-    # Process for each FPS value
-    for fps in fps_list:
-        # Skip if it's already the max FPS (already processed)
-        if fps == max_fps:
-            # Just rename the temp file
-            clip_path = os.path.join(output_base_dir, f"{video_id}__{clip_name}_{fps}.mp4")
-            shutil.copy(tmp_clip_path, clip_path)
-        else:
-            # Down-sample for remaining FPS values
-            clip_path = os.path.join(output_base_dir, f"{video_id}__{clip_name}_{fps}.mp4")
-            downsample_cmd = [
-                "ffmpeg", "-y",
-                "-i", tmp_clip_path,
-                "-r", str(fps),
-                clip_path
-            ]
-            print(f"Downsampling to {fps} FPS: {' '.join(downsample_cmd)}")
-            subprocess.run(downsample_cmd)
+    for i, fps in enumerate(fps_list):
+        clip_path = os.path.join(output_base_dir, f"{video_id}__{clip_name}_{fps}.mp4")
         
         # Create frames directory for this variant
         frames_dir = os.path.join(output_base_dir, "frames", f"{clip_name}_{fps}")
         os.makedirs(frames_dir, exist_ok=True)
         
-        # Extract frames
-        frames_cmd = [
-            "ffmpeg", "-y",
-            "-i", clip_path,
-            "-start_number", "0",
-            os.path.join(frames_dir, "frame_%04d.jpg")
-        ]
-        print(f"Extracting frames for {clip_name}_{fps}: {' '.join(frames_cmd)}")
-        subprocess.run(frames_cmd)
-    
-    # Remove temporary clip
-    if os.path.exists(tmp_clip_path):
-        os.remove(tmp_clip_path)
-        print(f"Removed temporary file {tmp_clip_path}")
+        # Clip video, keeping the source audio when there is any
+        cmd += ["-map", f"[v{i}]", "-map", "0:a?", clip_path]
+        # Frames of the same filtered stream
+        cmd += ["-map", f"[f{i}]", "-start_number", "0", os.path.join(frames_dir, "frame_%04d.jpg")]
+    
+    print(f"Extracting clip and frames at {', '.join(str(fps) for fps in fps_list)} FPS: {' '.join(cmd)}")
+    subprocess.run(cmd)
 
 def process_video(video_config):
     """Process a video's clip variants"""
@@ -182,11 +149,14 @@ def main():
             print(f"Error: Video ID '{target_video_id}' not found in config")
             sys.exit(1)
     
-    # Process each video
-    for video_config in videos:
-        success = process_video(video_config)
-        if not success:
-            print(f"Error processing video: {video_config.get('id')}")
+    # Videos write to separate output directories, so process them in parallel;
+    # ffmpeg is multi-threaded itself, hence the small worker count
+    if videos:
+        max_workers = min(len(videos), max(1, (os.cpu_count() or 1) // 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for video_config, success in zip(videos, executor.map(process_video, videos)):
+                if not success:
+                    print(f"Error processing video: {video_config.get('id')}")
     
     print("Processing complete!")
 
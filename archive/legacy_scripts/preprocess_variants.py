@@ -12,6 +12,10 @@ Usage:
 Options:
   --video-id ID   Process only this video ID (otherwise process all in config)
   --help          Show this help message
+
+Variant videos are encoded with NVENC or VideoToolbox when a working hardware
+encoder is found, otherwise with libx264. Set H264_ENCODER (e.g. libx264) to
+force a specific encoder.
 """
 
 import os
@@ -20,40 +24,102 @@ import getopt
 import yaml
 import subprocess
 import shutil
-import cv2
+import json
 import math
-import glob
+import functools
+import itertools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# libyaml's C parser when PyYAML was built with it, else the pure-Python safe loader
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+# libyaml's C emitter when PyYAML was built with it, else the pure-Python safe dumper
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
 def get_exact_fps(video_path):
-    """Get exact frame rate using multiple detection methods"""
-    cap = cv2.VideoCapture(video_path)
-    
-    if not cap.isOpened():
+    """Get exact frame rate from the container's declared frame rate"""
+    info = probe_video(video_path)
+    if not info or not info['fps']:
         print(f"Error: Could not open video {video_path}")
         return 30.0  # Default fallback
     
-    # Method 1: Get FPS from video properties
-    fps_prop = cap.get(cv2.CAP_PROP_FPS)
-    
-    # Method 2: Calculate from frame count and duration
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    
-    # Get duration by seeking to end
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count - 1)
-    duration_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
-    
-    if duration_ms > 0:
-        fps_calculated = (frame_count * 1000.0) / duration_ms
-    else:
-        fps_calculated = fps_prop
+    return info['fps']
+
+def probe_video(video_path):
+    """Read frame rate and duration from the container headers, or None if unreadable"""
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return None
     
-    cap.release()
+    # Cached per file version: every variant of a video probes the same source
+    return _probe_video(video_path, stat.st_mtime_ns, stat.st_size)
+
+@functools.lru_cache(maxsize=128)
+def _probe_video(video_path, mtime_ns, size):
+    """Run one ffprobe for one version of a video file"""
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=r_frame_rate,avg_frame_rate,nb_frames,duration:format=duration",
+        "-of", "json", video_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        data = json.loads(result.stdout)
+        stream = data["streams"][0]
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError, IndexError):
+        return None
+    
+    # r_frame_rate is the exact rational rate (e.g. 30000/1001); avg_frame_rate covers odd containers
+    fps = parse_frame_rate(stream.get("r_frame_rate")) or parse_frame_rate(stream.get("avg_frame_rate"))
+    # Some containers (e.g. MKV) only report the duration at the format level
+    duration = stream.get("duration") or data.get("format", {}).get("duration")
+    
+    return {
+        'fps': fps,
+        'duration': float(duration) if duration else 0
+    }
+
+def parse_frame_rate(rate):
+    """Convert an ffprobe rate such as '30000/1001' to a float, or 0 if unknown"""
+    try:
+        num, _, den = rate.partition("/")
+        return float(num) / float(den or 1)
+    except (AttributeError, ValueError, ZeroDivisionError):
+        return 0
+
+# Hardware H.264 encoders to try, in order, with their rate-control arguments; VAAPI is left
+# out because it needs a device and an hwupload filter rather than a drop-in codec swap
+HARDWARE_ENCODERS = [
+    ("h264_nvenc", ["-preset", "p4", "-rc", "vbr", "-b:v", "5M"]),
+    ("h264_videotoolbox", ["-b:v", "5M"]),
+]
+SOFTWARE_ENCODER = ("libx264", ["-preset", "fast"])
+
+@functools.lru_cache(maxsize=1)
+def detect_h264_encoder():
+    """Pick the H.264 encoder for variant videos, preferring a working hardware encoder"""
+    forced = os.environ.get("H264_ENCODER")
+    if forced:
+        for name, args in HARDWARE_ENCODERS + [SOFTWARE_ENCODER]:
+            if name == forced:
+                return name, args
+        return forced, []
+    
+    for name, args in HARDWARE_ENCODERS:
+        # Listed encoders may still lack a usable device, so encode a few blank frames to be sure
+        probe = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+            "-c:v", name, "-f", "null", "-"
+        ]
+        try:
+            if subprocess.run(probe, capture_output=True).returncode == 0:
+                print(f"Using hardware encoder {name}")
+                return name, args
+        except FileNotFoundError:
+            break
     
-    # Use the more precise value (if difference is small, use calculated)
-    if abs(fps_calculated - fps_prop) < 0.1:
-        return fps_calculated
-    else:
-        return fps_prop
+    return SOFTWARE_ENCODER
 
 def calculate_adjusted_fps(native_fps, target_fps):
     """Calculate adjusted FPS for perfect frame alignment"""
@@ -81,51 +147,21 @@ def calculate_adjusted_fps(native_fps, target_fps):
 
 def get_video_duration(video_path):
     """Get video duration in seconds"""
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        return 0
-    
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    duration = frame_count / fps if fps > 0 else 0
-    
-    cap.release()
-    return duration
+    info = probe_video(video_path)
+    return info['duration'] if info else 0
 
-def extract_frames_aligned(video_path, output_dir, native_fps, target_fps):
-    """Extract frames with perfect alignment to native FPS"""
-    adjusted_fps, divisor = calculate_adjusted_fps(native_fps, target_fps)
-    
-    print(f"  Native FPS: {native_fps:.3f}")
-    print(f"  Target FPS: {target_fps}")
-    print(f"  Adjusted FPS: {adjusted_fps:.3f}")
-    print(f"  Frame divisor: {divisor}")
-    
-    # Use ffmpeg with exact frame selection
-    cmd = [
-        "ffmpeg", "-i", video_path,
-        "-vf", f"select='not(mod(n\\,{divisor}))',setpts=N/FRAME_RATE/TB",
-        "-r", str(adjusted_fps),
-        "-start_number", "0",
-        os.path.join(output_dir, "frame_%04d.jpg"),
-        "-y"
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error extracting frames: {result.stderr}")
-        return False
-    
-    # Verify frame count
-    expected_frames = math.ceil(get_video_duration(video_path) * adjusted_fps)
-    actual_frames = len(glob.glob(os.path.join(output_dir, "frame_*.jpg")))
+def verify_frame_count(output_dir, expected_frames):
+    """Count extracted frames and warn when they differ from the expected count by more than one"""
+    with os.scandir(output_dir) as entries:
+        actual_frames = sum(1 for entry in entries
+                            if entry.name.startswith("frame_") and entry.name.endswith(".jpg"))
     
     if abs(actual_frames - expected_frames) > 1:
         print(f"Warning: Frame count mismatch. Expected ~{expected_frames}, got {actual_frames}")
     else:
         print(f"✓ Extracted {actual_frames} frames")
     
-    return adjusted_fps
+    return actual_frames
 
 def print_help():
     """Print help message"""
@@ -138,18 +174,28 @@ def load_config():
         print(f"Error: Configuration file {config_file} not found")
         sys.exit(1)
     
+    # Reparsed only when the file changes
+    return load_config_file(config_file, os.stat(config_file).st_mtime_ns)
+
+@functools.lru_cache(maxsize=4)
+def load_config_file(config_file, mtime_ns):
+    """Parse one version of a YAML config file"""
     with open(config_file, 'r') as file:
-        return yaml.safe_load(file)
+        return yaml.load(file, Loader=YAML_LOADER)
 
 def create_directory(path):
     """Create directory if it doesn't exist"""
     os.makedirs(path, exist_ok=True)
     return path
 
-def run_command(command):
-    """Run a shell command and display its output"""
-    print(f"Running: {command}")
-    result = subprocess.run(command, shell=True, capture_output=True, text=True)
+def run_ffmpeg(cmd):
+    """Run ffmpeg, discarding stdout and keeping stderr as raw bytes to decode only on failure"""
+    return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+def run_command(argv):
+    """Run a command given as an argument list and display its output"""
+    print(f"Running: {' '.join(argv)}")
+    result = subprocess.run(argv, capture_output=True, text=True, check=False)
     
     if result.returncode != 0:
         print(f"Error executing command: {result.stderr}")
@@ -158,6 +204,45 @@ def run_command(command):
     print(result.stdout)
     return True
 
+def process_variant(video_id, source_video, video_dir, native_fps, fps):
+    """Generate one FPS variant of a video and extract its frames"""
+    variant_key = f"full_{fps}"
+    variant_video = os.path.join(video_dir, f"{video_id}__{variant_key}.mp4")
+    frames_dir = create_directory(os.path.join(video_dir, "frames", variant_key))
+    
+    print(f"\nProcessing variant {variant_key} for {video_id}")
+    
+    # Calculate adjusted FPS for perfect alignment
+    adjusted_fps, divisor = calculate_adjusted_fps(native_fps, fps)
+    
+    # Decode the source once: the fps filter keeps every divisor-th native frame and the
+    # split feeds the same frames to both the variant encoder and the JPEG frame dump
+    print(f"Generating {variant_key} variant and frames with precise frame alignment")
+    encoder, encoder_args = detect_h264_encoder()
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error", "-nostats", "-hwaccel", "auto", "-i", source_video,
+        "-filter_complex", f"[0:v]fps={adjusted_fps}:round=down,split=2[vid][frm]",
+        "-map", "[vid]", "-map", "0:a?",
+        "-c:v", encoder, *encoder_args,
+        "-pix_fmt", "yuv420p",
+        variant_video,
+        "-map", "[frm]",
+        # Fixed JPEG quality instead of the default 200 kb/s target, on all cores
+        "-threads", "0", "-qscale:v", "3", "-huffman", "optimal",
+        "-start_number", "0",
+        os.path.join(frames_dir, "frame_%04d.jpg")
+    ]
+    
+    result = run_ffmpeg(cmd)
+    if result.returncode != 0:
+        print(f"Error generating {variant_key} variant: {result.stderr.decode(errors='replace')}")
+        return False
+    
+    verify_frame_count(frames_dir, math.ceil(get_video_duration(source_video) * adjusted_fps))
+    
+    print(f"✓ Successfully processed {variant_key} variant for {video_id}")
+    return True
+
 def process_video(video_config, config):
     """Process a single video from the configuration"""
     video_id = video_config.get('id')
@@ -187,43 +272,17 @@ def process_video(video_config, config):
     
     # Store actual FPS values for each variant
     actual_fps_map = {}
-    
-    # Process each FPS variant
     for fps in fps_variants:
-        variant_key = f"full_{fps}"
-        variant_video = os.path.join(video_dir, f"{video_id}__{variant_key}.mp4")
-        frames_dir = create_directory(os.path.join(video_dir, "frames", variant_key))
-        
-        print(f"\nProcessing variant {variant_key} for {video_id}")
-        
-        # Calculate adjusted FPS for perfect alignment
-        adjusted_fps, divisor = calculate_adjusted_fps(native_fps, fps)
-        actual_fps_map[fps] = adjusted_fps
-        
-        # Generate video at adjusted FPS using frame selection for precise alignment
-        print(f"Generating {variant_key} variant with precise frame alignment")
-        cmd = [
-            "ffmpeg", "-i", source_video,
-            "-vf", f"select='not(mod(n\\,{divisor}))',setpts=N/FRAME_RATE/TB",
-            "-r", str(adjusted_fps),
-            "-c:v", "libx264", "-preset", "fast",
-            "-pix_fmt", "yuv420p",
-            variant_video, "-y"
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"Error generating {variant_key} variant: {result.stderr}")
-            continue
-        
-        # Extract frames using the new aligned method
-        print(f"Extracting frames for {variant_key} variant")
-        actual_fps = extract_frames_aligned(variant_video, frames_dir, adjusted_fps, adjusted_fps)
-        if actual_fps is False:
-            print(f"Error extracting frames for {variant_key} variant")
-            continue
-        
-        print(f"✓ Successfully processed {variant_key} variant for {video_id}")
+        actual_fps_map[fps], _ = calculate_adjusted_fps(native_fps, fps)
+    
+    # Variants read the same source and write disjoint files; the work happens in
+    # ffmpeg subprocesses, so threads are enough to run them side by side
+    with ThreadPoolExecutor(max_workers=min(len(fps_variants), 4) or 1) as executor:
+        futures = [executor.submit(process_variant, video_id, source_video, video_dir, native_fps, fps)
+                   for fps in fps_variants]
+        # Re-raise unexpected errors from the workers, as the serial loop did
+        for future in futures:
+            future.result()
     
     # Save FPS mapping information
     fps_info_file = os.path.join(video_dir, "fps_info.yaml")
@@ -240,12 +299,17 @@ def process_video(video_config, config):
         }
     
     with open(fps_info_file, 'w') as f:
-        yaml.dump(fps_info, f, default_flow_style=False)
+        yaml.dump(fps_info, f, Dumper=YAML_DUMPER, default_flow_style=False)
     
     print(f"✓ Saved FPS information to {fps_info_file}")
     
     return True
 
+def process_video_job(video_config, config):
+    """Worker process entry point for a single video"""
+    print(f"\n=== Processing video: {video_config.get('id')} ===")
+    return process_video(video_config, config)
+
 def main():
     """Main function"""
     # Parse command line arguments
@@ -277,22 +341,24 @@ def main():
         print("Warning: No videos defined in configuration")
         sys.exit(0)
     
+    # Skip all but the target video (if specified)
+    if target_video_id:
+        videos = [v for v in videos if v.get('id') == target_video_id]
+    
     # Process videos
     success_count = 0
     fail_count = 0
     
-    for video_config in videos:
-        video_id = video_config.get('id')
-        
-        # Skip if not the target video (if specified)
-        if target_video_id and video_id != target_video_id:
-            continue
-        
-        print(f"\n=== Processing video: {video_id} ===")
-        if process_video(video_config, config):
-            success_count += 1
-        else:
-            fail_count += 1
+    # Each video writes only to its own static/videos/<id>/ directory, so videos can be
+    # processed in parallel; ffmpeg is multi-threaded itself, hence the small worker count
+    if videos:
+        max_workers = min(len(videos), max(1, (os.cpu_count() or 1) // 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for success in executor.map(process_video_job, videos, itertools.repeat(config)):
+                if success:
+                    success_count += 1
+                else:
+                    fail_count += 1
     
     # Print summary
     print(f"\n=== Processing complete ===")
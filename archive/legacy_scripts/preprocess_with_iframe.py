@@ -18,7 +18,8 @@ import os
 import sys
 import argparse
 import yaml
-from iframe_video_processor import IFrameVideoProcessor
+import functools
+from iframe_video_processor import IFrameVideoProcessor, YAML_LOADER
 
 
 def print_help():
@@ -55,8 +56,8 @@ def load_config(config_file="config.yaml"):
         return None
     
     try:
-        with open(config_file, 'r') as file:
-            config = yaml.safe_load(file)
+        # Reparsed only when the file changes
+        config = load_config_file(config_file, os.stat(config_file).st_mtime_ns)
         print(f"✅ Loaded configuration from {config_file}")
         return config
     except Exception as e:
@@ -64,6 +65,13 @@ def load_config(config_file="config.yaml"):
         return None
 
 
+@functools.lru_cache(maxsize=4)
+def load_config_file(config_file, mtime_ns):
+    """Parse one version of a YAML config file"""
+    with open(config_file, 'r') as file:
+        return yaml.load(file, Loader=YAML_LOADER)
+
+
 def validate_video_config(video_config):
     """Validate a video configuration"""
     required_fields = ['id', 'source_video']
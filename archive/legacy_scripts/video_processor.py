@@ -12,6 +12,31 @@ import shutil
 import yaml
 import cv2
 from frame_extractor import FrameExtractor
+from iframe_video_processor import YAML_DUMPER
+
+
+def link_or_copy(source_path, target_path):
+    """
+    Place source_path at target_path without duplicating its data when possible
+    
+    Hardlinks the file, and only copies the bytes when the filesystem does not
+    support that (e.g. across devices or on FAT/SMB). A hardlink stays valid
+    after the source is removed, so temporary clip sources are safe to link.
+    
+    Returns:
+        str: "hardlink" or "copy"
+    """
+    if os.path.lexists(target_path):
+        os.remove(target_path)
+    
+    try:
+        os.link(source_path, target_path)
+        return "hardlink"
+    except OSError:
+        pass
+    
+    shutil.copy2(source_path, target_path)
+    return "copy"
 
 
 class ProcessingError(Exception):
@@ -91,10 +116,10 @@ class VideoProcessor:
         # Create directory for target
         os.makedirs(os.path.dirname(target_path), exist_ok=True)
         
-        # If target FPS is same as source, just copy
+        # If target FPS is same as source, reuse the source file
         if abs(source_fps - target_fps) < 0.01:
-            print("  Same FPS - copying file")
-            shutil.copy2(source_path, target_path)
+            method = link_or_copy(source_path, target_path)
+            print(f"  Same FPS - reused source file ({method})")
             return True
         
         # Always use the fps filter to maintain duration properly
@@ -362,7 +387,7 @@ class VideoProcessor:
         # Save to file
         info_file = os.path.join(output_dir, f"{video_id}_processing_info.yaml")
         with open(info_file, 'w') as f:
-            yaml.dump(processing_info, f, default_flow_style=False)
+            yaml.dump(processing_info, f, Dumper=YAML_DUMPER, default_flow_style=False)
         
         print(f"✓ Saved processing info to {info_file}")
 
@@ -11,6 +11,74 @@ import subprocess
 import cv2
 import glob
 import math
+import collections
+from time_utils import time_to_seconds
+
+# ffmpeg log lines kept for error messages when stderr is streamed
+LOG_TAIL_LINES = 50
+
+
+def parse_showinfo_line(line):
+    """Return the pts_time of an ffmpeg showinfo log line, or None for any other line"""
+    # Format: [Parsed_showinfo_0 @ 0x...] n:0 pts:0 pts_time:0.000000 ...
+    pts_time_start = line.find('pts_time:')
+    if pts_time_start == -1 or 'showinfo' not in line:
+        return None
+    pts_time_start += 9
+    pts_time_end = line.find(' ', pts_time_start)
+    if pts_time_end == -1:
+        pts_time_end = len(line)
+    try:
+        return float(line[pts_time_start:pts_time_end])
+    except ValueError:
+        return None
+
+
+def parse_showinfo_timestamps(lines):
+    """
+    Collect pts_time values from ffmpeg showinfo log lines
+    
+    Args:
+        lines: Iterable of ffmpeg stderr lines
+        
+    Returns:
+        list: Timestamps in seconds, in output frame order
+    """
+    timestamps = []
+    for line in lines:
+        pts_time = parse_showinfo_line(line)
+        if pts_time is not None:
+            timestamps.append(pts_time)
+    return timestamps
+
+
+def run_ffmpeg_with_showinfo(cmd):
+    """
+    Run ffmpeg and parse showinfo timestamps from its log while it runs
+    
+    stderr is consumed line by line instead of being buffered whole, so a long
+    video's per-frame showinfo output is never held in memory at once. Only the
+    last other log lines are kept, for error reporting.
+    
+    Args:
+        cmd: ffmpeg command line
+        
+    Returns:
+        tuple: (return code, timestamps in output frame order, tail of the non-showinfo log)
+    """
+    timestamps = []
+    log_tail = collections.deque(maxlen=LOG_TAIL_LINES)
+    
+    with subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          text=True, errors='replace') as proc:
+        for line in proc.stderr:
+            pts_time = parse_showinfo_line(line)
+            if pts_time is not None:
+                timestamps.append(pts_time)
+            elif 'showinfo' not in line:
+                log_tail.append(line)
+    
+    return proc.returncode, timestamps, "".join(log_tail)
 
 
 class FrameExtractor:
@@ -50,6 +118,29 @@ class FrameExtractor:
         Returns:
             Tuple of (success: bool, frame_count: int)
         """
+        success, frame_count, _ = self._extract_frames(video_path, output_dir, target_fps, with_timestamps=False)
+        return success, frame_count
+    
+    def extract_frames_with_timestamps(self, video_path, output_dir, target_fps):
+        """
+        Extract frames at specific time intervals and report each frame's timestamp
+        
+        The timestamps come from a showinfo filter appended to the same ffmpeg run,
+        so the video is decoded once instead of again for a separate timestamp pass,
+        and each timestamp belongs to the frame that was actually written.
+        
+        Args:
+            video_path: Path to source video
+            output_dir: Directory to save frames
+            target_fps: Target frames per second for extraction
+            
+        Returns:
+            Tuple of (success: bool, frame_count: int, timestamps: list of seconds)
+        """
+        return self._extract_frames(video_path, output_dir, target_fps, with_timestamps=True)
+    
+    def _extract_frames(self, video_path, output_dir, target_fps, with_timestamps):
+        """Shared implementation of interval frame extraction"""
         os.makedirs(output_dir, exist_ok=True)
         
         # Get video info
@@ -62,35 +153,37 @@ class FrameExtractor:
         print(f"  Duration: {duration:.3f}s")
         
         # Calculate frame extraction strategy
+        filters = []
         if target_fps >= source_fps:
             # Extract all frames if target is higher than source
             print("  Strategy: Extract all frames (target >= source)")
-            cmd = [
-                "ffmpeg", "-i", video_path,
-                "-start_number", "0",
-                "-y",
-                os.path.join(output_dir, "frame_%04d.jpg")
-            ]
         else:
             # Use time-based selection for proper interval extraction
             frame_interval = 1.0 / target_fps
             print(f"  Strategy: Time-based selection every {frame_interval:.3f}s")
-            
-            cmd = [
-                "ffmpeg", "-i", video_path,
-                "-vf", f"select='eq(n\\,0)+gte(t-prev_selected_t\\,{frame_interval})'",
-                "-vsync", "0",
-                "-start_number", "0",
-                "-y",
-                os.path.join(output_dir, "frame_%04d.jpg")
-            ]
+            filters.append(f"select='eq(n\\,0)+gte(t-prev_selected_t\\,{frame_interval})'")
+        
+        if with_timestamps:
+            # Logs pts_time for every frame that reaches the output
+            filters.append("showinfo")
+        
+        cmd = ["ffmpeg", "-i", video_path]
+        if filters:
+            cmd += ["-vf", ",".join(filters)]
+        if len(filters) > int(with_timestamps):
+            cmd += ["-vsync", "0"]
+        cmd += [
+            "-start_number", "0",
+            "-y",
+            os.path.join(output_dir, "frame_%04d.jpg")
+        ]
         
         # Execute frame extraction
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        returncode, timestamps, log = run_ffmpeg_with_showinfo(cmd)
         
-        if result.returncode != 0:
-            print(f"Error extracting frames: {result.stderr}")
-            return False, 0
+        if returncode != 0:
+            print(f"Error extracting frames: {log}")
+            return False, 0, []
         
         # Count extracted frames
         frame_files = glob.glob(os.path.join(output_dir, "frame_*.jpg"))
@@ -105,7 +198,7 @@ class FrameExtractor:
         else:
             print(f"✓ Extracted {actual_frame_count} frames (expected ~{expected_frame_count})")
         
-        return True, actual_frame_count
+        return True, actual_frame_count, timestamps
     
     def extract_clip_frames_at_intervals(self, video_path, output_dir, start_time, end_time, target_fps):
         """
@@ -124,17 +217,6 @@ class FrameExtractor:
         os.makedirs(output_dir, exist_ok=True)
         
         # Convert time strings to seconds for calculation
-        def time_to_seconds(time_str):
-            parts = time_str.split(':')
-            seconds_parts = parts[-1].split('.')
-            
-            hours = int(parts[0]) if len(parts) > 2 else 0
-            minutes = int(parts[-2] if len(parts) > 1 else parts[0])
-            seconds = int(seconds_parts[0])
-            milliseconds = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
-            
-            return hours * 3600 + minutes * 60 + seconds + milliseconds / 10
-        
         start_seconds = time_to_seconds(start_time)
         end_seconds = time_to_seconds(end_time)
         clip_duration = end_seconds - start_seconds
@@ -146,10 +228,13 @@ class FrameExtractor:
         frame_interval = 1.0 / target_fps
         print(f"  Strategy: Time-based selection every {frame_interval:.3f}s from clip")
         
+        # Seeking before -i jumps to the nearest keyframe instead of decoding from the start of
+        # the file; ffmpeg still decodes forward to the exact start time (accurate_seek)
         cmd = [
-            "ffmpeg", "-i", video_path,
+            "ffmpeg",
             "-ss", start_time,
             "-to", end_time,
+            "-i", video_path,
             "-vf", f"select='eq(n\\,0)+gte(t-prev_selected_t\\,{frame_interval})'",
             "-vsync", "0",
             "-start_number", "0",
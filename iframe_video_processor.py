@@ -9,54 +9,94 @@ This ensures deterministic and perfectly aligned frame extraction across all FPS
 """
 
 import os
+import json
+import functools
 import subprocess
 import shutil
 import yaml
 import cv2
 import time
 from pathlib import Path
-from frame_extractor import FrameExtractor
+from concurrent.futures import ThreadPoolExecutor
+from frame_extractor import FrameExtractor, run_ffmpeg_with_showinfo
+from time_utils import time_to_seconds
+
+# Upper bound on threads used to generate thumbnails for one frames directory
+THUMBNAIL_WORKERS = 16
+
+# libyaml's C parser and emitter when PyYAML was built with them, else the pure-Python
+# safe loader and dumper; the preprocessing scripts import these from here
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+def parse_frame_rate(rate):
+    """Parse an ffprobe rational such as "60000/1001" into frames per second"""
+    num, _, den = rate.partition("/")
+    return float(num) / float(den or 1)
+
+
+@functools.lru_cache(maxsize=64)
+def probe_video_info(video_path, mtime_ns, size):
+    """Probe one version of a video file with ffprobe; callers must not mutate the result"""
+    command = [
+        "ffprobe", "-v", "quiet", "-print_format", "json", 
+        "-show_format", "-show_streams", video_path
+    ]
+    
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        info = json.loads(result.stdout)
+        
+        video_stream = next(s for s in info['streams'] if s['codec_type'] == 'video')
+        duration = float(info['format']['duration'])
+        fps = parse_frame_rate(video_stream['r_frame_rate'])  # e.g., "60/1" -> 60.0
+        
+        return {
+            'duration': duration,
+            'fps': fps,
+            'width': video_stream['width'],
+            'height': video_stream['height'],
+            'codec': video_stream['codec_name']
+        }
+    except Exception as e:
+        print(f"Error getting video info: {e}")
+        return None
 
 
 class IFrameVideoProcessor:
     """Video processor that uses I-frame-only re-encoding for consistent frame extraction"""
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, ffmpeg_threads=None):
         """
         Initialize I-frame video processor
         
         Args:
             config: Configuration dictionary (optional)
+            ffmpeg_threads: Threads per ffmpeg encode (optional, default lets ffmpeg decide)
         """
         self.config = config or {}
+        self.ffmpeg_threads = ffmpeg_threads
         self.frame_extractor = FrameExtractor()
     
+    def thread_args(self):
+        """ffmpeg output options capping encoder threads, when a limit is set"""
+        if self.ffmpeg_threads:
+            return ["-threads", str(self.ffmpeg_threads)]
+        return []
+    
     def get_video_info(self, video_path):
         """Get video information using ffprobe"""
-        command = [
-            "ffprobe", "-v", "quiet", "-print_format", "json", 
-            "-show_format", "-show_streams", video_path
-        ]
-        
         try:
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
-            import json
-            info = json.loads(result.stdout)
-            
-            video_stream = next(s for s in info['streams'] if s['codec_type'] == 'video')
-            duration = float(info['format']['duration'])
-            fps = eval(video_stream['r_frame_rate'])  # e.g., "60/1" -> 60.0
-            
-            return {
-                'duration': duration,
-                'fps': fps,
-                'width': video_stream['width'],
-                'height': video_stream['height'],
-                'codec': video_stream['codec_name']
-            }
-        except Exception as e:
+            stat = os.stat(video_path)
+        except OSError as e:
             print(f"Error getting video info: {e}")
             return None
+        
+        # The pipeline probes the same source and I-frame videos once per variant,
+        # so results are memoized until the file changes
+        info = probe_video_info(video_path, stat.st_mtime_ns, stat.st_size)
+        return dict(info) if info else None
     
     def extract_frame_timestamps(self, video_path):
         """
@@ -82,26 +122,8 @@ class IFrameVideoProcessor:
         ]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            
-            # Parse timestamps from stderr (where showinfo outputs)
-            timestamps = []
-            lines = result.stderr.split('\n')
-            
-            for line in lines:
-                if 'showinfo' in line and 'pts_time:' in line:
-                    # Extract pts_time value
-                    # Format: [Parsed_showinfo_0 @ 0x...] n:0 pts:0 pts_time:0.000000 ...
-                    try:
-                        pts_time_start = line.find('pts_time:') + 9
-                        pts_time_end = line.find(' ', pts_time_start)
-                        if pts_time_end == -1:
-                            pts_time_end = len(line)
-                        
-                        timestamp = float(line[pts_time_start:pts_time_end])
-                        timestamps.append(timestamp)
-                    except (ValueError, IndexError):
-                        continue
+            # Parse timestamps from stderr (where showinfo outputs) as ffmpeg produces them
+            _, timestamps, _ = run_ffmpeg_with_showinfo(cmd)
             
             print(f"✅ Extracted {len(timestamps)} frame timestamps")
             return timestamps
@@ -119,34 +141,33 @@ class IFrameVideoProcessor:
             frames_dir: Directory where frames are stored
             variant_key: Variant identifier (e.g., 'full_30', 'clip_001_10')
         """
-        import json
-        
-        # Create frame-to-timestamp mapping
-        frame_mapping = {}
-        for i, timestamp in enumerate(timestamps):
-            frame_filename = f"frame_{i:04d}.jpg"  # Match frame extractor naming
-            frame_mapping[frame_filename] = {
-                'frame_index': i,
-                'timestamp': timestamp,
-                'frame_number': i + 1  # 1-based frame numbering for UI
-            }
-        
-        # Save to JSON file
         timestamp_file = os.path.join(frames_dir, "frame_timestamps.json")
+        # The app may read the file while it is being written, so build it beside the target
+        tmp_file = f"{timestamp_file}.{os.getpid()}.tmp"
         
         try:
-            with open(timestamp_file, 'w') as f:
-                json.dump({
-                    'variant': variant_key,
-                    'total_frames': len(timestamps),
-                    'frame_mapping': frame_mapping
-                }, f, indent=2)
+            # Stream one frame-to-timestamp entry per line instead of building the whole
+            # mapping and indenting it in memory; the document structure is unchanged
+            with open(tmp_file, 'w') as f:
+                f.write('{"variant": %s, "total_frames": %d, "frame_mapping": {'
+                        % (json.dumps(variant_key), len(timestamps)))
+                for i, timestamp in enumerate(timestamps):
+                    frame_filename = f"frame_{i:04d}.jpg"  # Match frame extractor naming
+                    f.write('%s\n  "%s": %s' % ("," if i else "", frame_filename, json.dumps({
+                        'frame_index': i,
+                        'timestamp': timestamp,
+                        'frame_number': i + 1  # 1-based frame numbering for UI
+                    })))
+                f.write('\n}}\n')
+            os.replace(tmp_file, timestamp_file)
             
             print(f"✅ Saved frame timestamps to {timestamp_file}")
             return True
             
         except Exception as e:
             print(f"❌ Error saving frame timestamps: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
             return False
     
     def create_iframe_only_video(self, source_path, iframe_path):
@@ -180,6 +201,7 @@ class IFrameVideoProcessor:
             "-c:v", "libx264",
             "-preset", "fast",
             "-crf", "18",
+            *self.thread_args(),
             iframe_path
         ]
         
@@ -237,6 +259,7 @@ class IFrameVideoProcessor:
             "-c:v", "libx264", "-preset", "fast",
             "-pix_fmt", "yuv420p",
             "-c:a", "copy",  # Copy audio unchanged
+            *self.thread_args(),
             target_path
         ]
         
@@ -279,15 +302,18 @@ class IFrameVideoProcessor:
         # Create directory for clip
         os.makedirs(os.path.dirname(clip_path), exist_ok=True)
         
-        # Extract clip with precise timing from I-frame-only video
+        # Extract clip with precise timing from I-frame-only video; every frame is a keyframe,
+        # so seeking on the input lands exactly on the start time without decoding the prefix
         cmd = [
-            "ffmpeg", "-y", "-i", iframe_path,
+            "ffmpeg", "-y",
             "-ss", start_time,
             "-to", end_time,
+            "-i", iframe_path,
             "-c:v", "libx264", "-preset", "fast",
             "-pix_fmt", "yuv420p",
             "-c:a", "copy",  # Copy audio unchanged
             "-avoid_negative_ts", "make_zero",  # Handle timing issues
+            *self.thread_args(),
             clip_path
         ]
         
@@ -303,21 +329,7 @@ class IFrameVideoProcessor:
     
     def time_to_seconds(self, time_str):
         """Convert time string (HH:MM:SS.S) to seconds"""
-        try:
-            # Split by : and .
-            parts = time_str.split(':')
-            seconds_parts = parts[-1].split('.')
-            
-            hours = int(parts[0]) if len(parts) > 2 else 0
-            minutes = int(parts[-2] if len(parts) > 1 else parts[0])
-            seconds = int(seconds_parts[0])
-            milliseconds = int(seconds_parts[1]) if len(seconds_parts) > 1 else 0
-            
-            total_seconds = hours * 3600 + minutes * 60 + seconds + milliseconds / 10
-            return total_seconds
-        except Exception as e:
-            print(f"Error parsing time string '{time_str}': {e}")
-            return 0
+        return time_to_seconds(time_str)
     
     def process_video_with_iframe_preprocessing(self, video_config, output_dir):
         """
@@ -385,20 +397,17 @@ class IFrameVideoProcessor:
             if variant_success:
                 # Extract frames from the variant
                 frames_dir = os.path.join(output_dir, "frames", variant_key)
-                frame_success, frame_count = self.frame_extractor.extract_frames_at_intervals(
+                # One decode writes the frames and reports their presentation timestamps
+                frame_success, frame_count, timestamps = self.frame_extractor.extract_frames_with_timestamps(
                     variant_path, frames_dir, target_fps
                 )
                 
                 if frame_success:
                     # Generate thumbnails for faster loading
                     print(f"🔄 Generating thumbnails for {variant_key}")
-                    self.generate_thumbnails(frames_dir, thumbnail_size=(200, 150))
-                    self.generate_large_thumbnails(frames_dir, thumbnail_size=(400, 300))
-                    
-                    # Extract and save precise timestamps for this variant
-                    print(f"🔄 Extracting timestamps for {variant_key}")
-                    timestamps = self.extract_frame_timestamps(variant_path)
+                    self.generate_all_thumbnails(frames_dir)
                     
+                    # Save the precise timestamps reported during frame extraction
                     if timestamps and len(timestamps) >= frame_count:
                         # Use only the timestamps that correspond to extracted frames
                         frame_timestamps = timestamps[:frame_count]
@@ -467,20 +476,17 @@ class IFrameVideoProcessor:
                     if variant_success:
                         # Extract frames from the clip variant
                         frames_dir = os.path.join(output_dir, "frames", variant_key)
-                        frame_success, frame_count = self.frame_extractor.extract_frames_at_intervals(
+                        # One decode writes the frames and reports their presentation timestamps
+                        frame_success, frame_count, timestamps = self.frame_extractor.extract_frames_with_timestamps(
                             variant_path, frames_dir, target_fps
                         )
                         
                         if frame_success:
                             # Generate thumbnails for faster loading
                             print(f"  🔄 Generating thumbnails for {variant_key}")
-                            self.generate_thumbnails(frames_dir, thumbnail_size=(200, 150))
-                            self.generate_large_thumbnails(frames_dir, thumbnail_size=(400, 300))
-                            
-                            # Extract and save precise timestamps for this clip variant
-                            print(f"  🔄 Extracting timestamps for {variant_key}")
-                            timestamps = self.extract_frame_timestamps(variant_path)
+                            self.generate_all_thumbnails(frames_dir)
                             
+                            # Save the precise timestamps reported during frame extraction
                             if timestamps and len(timestamps) >= frame_count:
                                 # Use only the timestamps that correspond to extracted frames
                                 frame_timestamps = timestamps[:frame_count]
@@ -551,61 +557,7 @@ class IFrameVideoProcessor:
         Returns:
             bool: Success status
         """
-        import cv2
-        import glob
-        
-        print(f"🔄 Generating thumbnails in {frames_dir}")
-        
-        # Create thumbnails directory
-        thumbnails_dir = os.path.join(frames_dir, "thumbnails")
-        os.makedirs(thumbnails_dir, exist_ok=True)
-        
-        # Find all frame files
-        frame_files = sorted(glob.glob(os.path.join(frames_dir, "frame_*.jpg")))
-        
-        if not frame_files:
-            print("❌ No frame files found for thumbnail generation")
-            return False
-        
-        success_count = 0
-        
-        for frame_file in frame_files:
-            try:
-                # Read the full-size frame
-                img = cv2.imread(frame_file)
-                if img is None:
-                    print(f"⚠️  Could not read frame: {frame_file}")
-                    continue
-                
-                # Resize to thumbnail size while maintaining aspect ratio
-                height, width = img.shape[:2]
-                target_width, target_height = thumbnail_size
-                
-                # Calculate scaling to fit within target size while maintaining aspect ratio
-                scale_w = target_width / width
-                scale_h = target_height / height
-                scale = min(scale_w, scale_h)
-                
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                
-                # Resize the image
-                thumbnail = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                
-                # Save thumbnail with same filename in thumbnails directory
-                thumbnail_file = os.path.join(thumbnails_dir, os.path.basename(frame_file))
-                
-                # Use higher compression for thumbnails to reduce file size
-                cv2.imwrite(thumbnail_file, thumbnail, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                
-                success_count += 1
-                
-            except Exception as e:
-                print(f"⚠️  Error creating thumbnail for {frame_file}: {e}")
-                continue
-        
-        print(f"✅ Generated {success_count}/{len(frame_files)} thumbnails")
-        return success_count > 0
+        return self.generate_thumbnail_sets(frames_dir, {"thumbnails": (thumbnail_size, 85)})
 
     def generate_large_thumbnails(self, frames_dir, thumbnail_size=(400, 300)):
         """
@@ -618,63 +570,99 @@ class IFrameVideoProcessor:
             frames_dir: Directory containing full-size frame images
             thumbnail_size: Tuple of (width, height) for large thumbnails
             
+        Returns:
+            bool: Success status
+        """
+        return self.generate_thumbnail_sets(frames_dir, {"large_thumbnails": (thumbnail_size, 90)})
+
+    def generate_all_thumbnails(self, frames_dir, thumbnail_size=(200, 150), large_thumbnail_size=(400, 300)):
+        """
+        Generate the regular and large thumbnails in a single pass over the frames
+        
+        Each full-size frame is decoded once and resized for both sets, instead of
+        being read back from disk separately for every thumbnail size.
+        
+        Args:
+            frames_dir: Directory containing full-size frame images
+            thumbnail_size: Tuple of (width, height) for thumbnails
+            large_thumbnail_size: Tuple of (width, height) for large thumbnails
+            
+        Returns:
+            bool: Success status
+        """
+        return self.generate_thumbnail_sets(frames_dir, {
+            "thumbnails": (thumbnail_size, 85),
+            "large_thumbnails": (large_thumbnail_size, 90),
+        })
+
+    def generate_thumbnail_sets(self, frames_dir, thumbnail_sets):
+        """
+        Generate one or more thumbnail sets, decoding each frame only once
+        
+        Args:
+            frames_dir: Directory containing full-size frame images
+            thumbnail_sets: Dict mapping subdirectory name to ((width, height), jpeg_quality)
+            
         Returns:
             bool: Success status
         """
         import cv2
         import glob
         
-        print(f"🔄 Generating large thumbnails in {frames_dir}")
+        print(f"🔄 Generating {', '.join(thumbnail_sets)} in {frames_dir}")
         
-        # Create large thumbnails directory
-        large_thumbnails_dir = os.path.join(frames_dir, "large_thumbnails")
-        os.makedirs(large_thumbnails_dir, exist_ok=True)
+        # Create one output directory per thumbnail set
+        output_dirs = {}
+        for subdir in thumbnail_sets:
+            output_dirs[subdir] = os.path.join(frames_dir, subdir)
+            os.makedirs(output_dirs[subdir], exist_ok=True)
         
         # Find all frame files
         frame_files = sorted(glob.glob(os.path.join(frames_dir, "frame_*.jpg")))
         
         if not frame_files:
-            print("❌ No frame files found for large thumbnail generation")
+            print("❌ No frame files found for thumbnail generation")
             return False
         
-        success_count = 0
-        
-        for frame_file in frame_files:
+        def make_thumbnails(frame_file):
             try:
-                # Read the full-size frame
+                # Read the full-size frame once for every thumbnail set
                 img = cv2.imread(frame_file)
                 if img is None:
                     print(f"⚠️  Could not read frame: {frame_file}")
-                    continue
+                    return False
                 
-                # Resize to large thumbnail size while maintaining aspect ratio
                 height, width = img.shape[:2]
-                target_width, target_height = thumbnail_size
+                frame_name = os.path.basename(frame_file)
                 
-                # Calculate scaling to fit within target size while maintaining aspect ratio
-                scale_w = target_width / width
-                scale_h = target_height / height
-                scale = min(scale_w, scale_h)
-                
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                
-                # Resize the image
-                large_thumbnail = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                
-                # Save large thumbnail with same filename in large_thumbnails directory
-                large_thumbnail_file = os.path.join(large_thumbnails_dir, os.path.basename(frame_file))
-                
-                # Use good quality for large thumbnails but still compressed
-                cv2.imwrite(large_thumbnail_file, large_thumbnail, [cv2.IMWRITE_JPEG_QUALITY, 90])
+                for subdir, (thumbnail_size, quality) in thumbnail_sets.items():
+                    target_width, target_height = thumbnail_size
+                    
+                    # Calculate scaling to fit within target size while maintaining aspect ratio
+                    scale = min(target_width / width, target_height / height)
+                    new_width = int(width * scale)
+                    new_height = int(height * scale)
+                    
+                    # Resize from the original frame so every set keeps full INTER_AREA quality
+                    thumbnail = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
+                    
+                    # Save thumbnail with same filename in the set's directory
+                    cv2.imwrite(os.path.join(output_dirs[subdir], frame_name), thumbnail,
+                                [cv2.IMWRITE_JPEG_QUALITY, quality])
                 
-                success_count += 1
+                return True
                 
             except Exception as e:
-                print(f"⚠️  Error creating large thumbnail for {frame_file}: {e}")
-                continue
+                print(f"⚠️  Error creating thumbnails for {frame_file}: {e}")
+                return False
+        
+        # OpenCV releases the GIL while decoding, resizing and encoding, so frames are
+        # processed on a thread pool; stay within the thread budget when one is set
+        workers = self.ffmpeg_threads or min(THUMBNAIL_WORKERS, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            success_count = sum(executor.map(make_thumbnails, frame_files))
         
-        print(f"✅ Generated {success_count}/{len(frame_files)} large thumbnails")
+        print(f"✅ Generated thumbnails for {success_count}/{len(frame_files)} frames")
         return success_count > 0
 
 
@@ -684,7 +672,7 @@ def main():
     config_file = "config.yaml"
     if os.path.exists(config_file):
         with open(config_file, 'r') as file:
-            config = yaml.safe_load(file)
+            config = yaml.load(file, Loader=YAML_LOADER)
     else:
         print(f"Config file {config_file} not found")
         return 1
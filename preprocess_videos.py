@@ -35,6 +35,9 @@ import time
 from datetime import datetime
 from video_processor import VideoProcessor, ProcessingError, ValidationError
 
+# libyaml's C parser when PyYAML was built with it, else the pure-Python safe loader
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 def print_help():
     """Print help message"""
@@ -49,7 +52,7 @@ def load_config():
         sys.exit(1)
     
     with open(config_file, 'r') as file:
-        return yaml.safe_load(file)
+        return yaml.load(file, Loader=YAML_LOADER)
 
 
 def validate_config(config):
@@ -11,6 +11,7 @@ Usage:
 Options:
   --video-id ID   Process only this video ID (otherwise process all in config)
   --force         Force re-processing even if outputs already exist
+  --workers N     Number of videos to process in parallel
   --help          Show this help message
 """
 
@@ -18,7 +19,11 @@ import os
 import sys
 import argparse
 import yaml
-from iframe_video_processor import IFrameVideoProcessor
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from iframe_video_processor import IFrameVideoProcessor, YAML_LOADER
+
+# Threads each ffmpeg encode is allowed when several videos are processed at once
+THREADS_PER_FFMPEG = 4
 
 
 def print_help():
@@ -56,7 +61,7 @@ def load_config(config_file="config.yaml"):
     
     try:
         with open(config_file, 'r') as file:
-            config = yaml.safe_load(file)
+            config = yaml.load(file, Loader=YAML_LOADER)
         print(f"✅ Loaded configuration from {config_file}")
         return config
     except Exception as e:
@@ -104,6 +109,20 @@ def check_existing_outputs(video_id, output_dir, force=False):
     return False  # Proceed with processing
 
 
+def should_skip_video(video_id, force=False):
+    """Ask whether to skip a video whose outputs already exist"""
+    output_dir = os.path.join("static", "videos", video_id)
+    
+    # Check if outputs already exist
+    if check_existing_outputs(video_id, output_dir, force):
+        response = input(f"Skip processing {video_id}? [Y/n]: ").strip().lower()
+        if response in ['', 'y', 'yes']:
+            print(f"⏭️  Skipping {video_id}")
+            return True
+    
+    return False
+
+
 def process_single_video(processor, video_config, force=False):
     """Process a single video configuration"""
     video_id = video_config.get('id')
@@ -119,13 +138,6 @@ def process_single_video(processor, video_config, force=False):
     # Set up output directory
     output_dir = os.path.join("static", "videos", video_id)
     
-    # Check if outputs already exist
-    if check_existing_outputs(video_id, output_dir, force):
-        response = input(f"Skip processing {video_id}? [Y/n]: ").strip().lower()
-        if response in ['', 'y', 'yes']:
-            print(f"⏭️  Skipping {video_id}")
-            return True
-    
     # Process the video
     try:
         results = processor.process_video_with_iframe_preprocessing(video_config, output_dir)
@@ -151,6 +163,12 @@ def process_single_video(processor, video_config, force=False):
         return False
 
 
+def process_video_job(config, video_config, ffmpeg_threads=None):
+    """Process one video in a worker process with its own processor"""
+    processor = IFrameVideoProcessor(config, ffmpeg_threads=ffmpeg_threads)
+    return process_single_video(processor, video_config)
+
+
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(
@@ -162,6 +180,8 @@ def main():
                        help="Force re-processing even if outputs exist")
     parser.add_argument("--config", default="config.yaml",
                        help="Configuration file path (default: config.yaml)")
+    parser.add_argument("--workers", type=int,
+                       help="Videos processed in parallel (default: CPU count / %d)" % THREADS_PER_FFMPEG)
     
     args = parser.parse_args()
     
@@ -177,9 +197,6 @@ def main():
     if not config:
         return 1
     
-    # Create processor
-    processor = IFrameVideoProcessor(config)
-    
     # Get videos to process
     videos_to_process = []
     
@@ -209,11 +226,47 @@ def main():
     successful = 0
     failed = 0
     
+    # Ask about existing outputs up front; worker processes cannot prompt
+    pending = []
     for video_config in videos_to_process:
-        if process_single_video(processor, video_config, args.force):
+        video_id = video_config.get('id')
+        if video_id and should_skip_video(video_id, args.force):
             successful += 1
         else:
-            failed += 1
+            pending.append(video_config)
+    
+    cpu_count = os.cpu_count() or 1
+    workers = args.workers or max(1, cpu_count // THREADS_PER_FFMPEG)
+    workers = max(1, min(workers, len(pending)))
+    
+    if workers == 1:
+        processor = IFrameVideoProcessor(config)
+        for video_config in pending:
+            if process_single_video(processor, video_config):
+                successful += 1
+            else:
+                failed += 1
+    else:
+        # Videos write to separate output directories, so encode them side by side and
+        # split the cores between the concurrent ffmpeg processes
+        ffmpeg_threads = max(1, cpu_count // workers)
+        print(f"⚙️  Processing {len(pending)} videos with {workers} workers "
+              f"({ffmpeg_threads} ffmpeg threads each)")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(process_video_job, config, video_config, ffmpeg_threads): video_config
+                for video_config in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    success = future.result()
+                except Exception as e:
+                    print(f"\n❌ Error processing {futures[future].get('id')}: {e}")
+                    success = False
+                if success:
+                    successful += 1
+                else:
+                    failed += 1
     
     # Final summary
     print(f"\n{'='*60}")
@@ -0,0 +1,29 @@
+import os
+
+from app import load_annotation_snapshot
+
+HEADER = 'id,start_frame,end_frame,event_type,notes\n'
+
+
+def test_unchanged_snapshot_is_parsed_once(tmp_path):
+    csv_path = tmp_path / 'annotations_20250101T000000.csv'
+    csv_path.write_text(HEADER + 'a,1,5,Goal,\n')
+
+    first = load_annotation_snapshot('cache_video', str(csv_path))
+    second = load_annotation_snapshot('cache_video', str(csv_path))
+
+    assert first == [{'id': 'a', 'start': 1, 'end': 5, 'type': 'Goal', 'notes': ''}]
+    assert second is first
+
+
+def test_modified_snapshot_is_reparsed(tmp_path):
+    csv_path = tmp_path / 'annotations_20250101T000000.csv'
+    csv_path.write_text(HEADER + 'a,1,5,Goal,\n')
+    load_annotation_snapshot('cache_video_2', str(csv_path))
+
+    csv_path.write_text(HEADER + 'a,1,5,Goal,\nb,7,9,Foul,late\n')
+    # Force a distinct mtime in case the filesystem timestamp granularity is coarse
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert [a['id'] for a in load_annotation_snapshot('cache_video_2', str(csv_path))] == ['a', 'b']
@@ -0,0 +1,78 @@
+import datetime as real_datetime
+
+import pytest
+
+import app as app_module
+from app import app
+
+ANNOTATION = {'id': 'a', 'start': 1, 'end': 5, 'type': 'Goal', 'notes': ''}
+
+
+class FakeClock:
+    """Stands in for app.datetime so each snapshot gets its own filename"""
+
+    def __init__(self):
+        self.current = real_datetime.datetime(2025, 1, 1)
+
+    def now(self):
+        self.current += real_datetime.timedelta(seconds=1)
+        return self.current
+
+
+@pytest.fixture
+def annotations_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'ANNOTATION_BASE_DIR', str(tmp_path))
+    monkeypatch.setattr(app_module, 'datetime', FakeClock())
+    monkeypatch.setattr(app_module, 'SAVE_COALESCE_SECONDS', 60)
+    monkeypatch.setattr(app_module, 'ANNOTATION_SNAPSHOTS_KEEP', 20)
+    return tmp_path
+
+
+def save(video_id, annotations):
+    response = app.test_client().post(f'/save_annotations/{video_id}', json={'annotations': annotations})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def snapshots(annotations_dir, video_id):
+    return sorted(p.name for p in (annotations_dir / video_id).glob('annotations_*.csv'))
+
+
+def test_saves_within_window_overwrite_one_snapshot(annotations_dir):
+    first = save('coalesce_video', [ANNOTATION])
+    second = save('coalesce_video', [ANNOTATION, dict(ANNOTATION, id='b', start=7, end=9)])
+
+    assert second['filename'] == first['filename']
+    assert snapshots(annotations_dir, 'coalesce_video') == [first['filename']]
+    assert 'b,7,9' in (annotations_dir / 'coalesce_video' / first['filename']).read_text()
+
+
+def test_save_does_not_coalesce_behind_newer_snapshot(annotations_dir):
+    first = save('other_writer_video', [ANNOTATION])
+    # Another worker process writes a newer snapshot
+    newer = annotations_dir / 'other_writer_video' / 'annotations_20250101T000030.csv'
+    newer.write_text('id,start_frame,end_frame,event_type,notes\n')
+    app_module.datetime.current = real_datetime.datetime(2025, 1, 1, 0, 1)
+
+    second = save('other_writer_video', [dict(ANNOTATION, notes='edited')])
+
+    assert second['filename'] != first['filename']
+    assert snapshots(annotations_dir, 'other_writer_video')[-1] == second['filename']
+
+
+def test_unchanged_annotations_are_not_rewritten(annotations_dir):
+    first = save('unchanged_video', [ANNOTATION])
+    second = save('unchanged_video', [ANNOTATION])
+
+    assert second['unchanged'] is True
+    assert second['filename'] == first['filename']
+    assert snapshots(annotations_dir, 'unchanged_video') == [first['filename']]
+
+
+def test_old_snapshots_are_pruned(annotations_dir, monkeypatch):
+    monkeypatch.setattr(app_module, 'SAVE_COALESCE_SECONDS', 0)
+    monkeypatch.setattr(app_module, 'ANNOTATION_SNAPSHOTS_KEEP', 2)
+
+    names = [save('prune_video', [dict(ANNOTATION, start=n)])['filename'] for n in range(4)]
+
+    assert snapshots(annotations_dir, 'prune_video') == names[-2:]
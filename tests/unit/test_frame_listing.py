@@ -0,0 +1,29 @@
+import os
+
+from app import scan_frames_dir
+
+
+def test_frames_sorted_by_frame_number(tmp_path):
+    for name in ['frame_10000.jpg', 'frame_1001.jpg', 'frame_0002.jpg', 'notes.txt']:
+        (tmp_path / name).write_bytes(b'fake')
+
+    assert scan_frames_dir(str(tmp_path))[0] == ['frame_0002.jpg', 'frame_1001.jpg', 'frame_10000.jpg']
+
+
+def test_frame_listing_refreshes_when_directory_changes(tmp_path):
+    (tmp_path / 'frame_0000.jpg').write_bytes(b'fake')
+    assert scan_frames_dir(str(tmp_path))[0] == ['frame_0000.jpg']
+
+    (tmp_path / 'frame_0001.jpg').write_bytes(b'fake')
+    # Force a distinct mtime in case the filesystem timestamp granularity is coarse
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert scan_frames_dir(str(tmp_path))[0] == ['frame_0000.jpg', 'frame_0001.jpg']
+
+
+def test_frame_extension_match_is_case_insensitive(tmp_path):
+    for name in ['frame_0000.JPG', 'frame_0001.jpeg', 'frame_0002.png', 'frame_0003.gif']:
+        (tmp_path / name).write_bytes(b'fake')
+
+    assert scan_frames_dir(str(tmp_path))[0] == ['frame_0000.JPG', 'frame_0001.jpeg', 'frame_0002.png']
@@ -0,0 +1,37 @@
+import sys
+
+from frame_extractor import parse_showinfo_timestamps, run_ffmpeg_with_showinfo
+
+
+def test_collects_pts_time_from_showinfo_lines_only():
+    stderr = [
+        "Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'variant.mp4':",
+        "[Parsed_showinfo_1 @ 0x55d0] n:   0 pts:      0 pts_time:0       duration:512",
+        "frame=    1 fps=0.0 q=2.0 size=N/A time=00:00:00.03",
+        "[Parsed_showinfo_1 @ 0x55d0] n:   1 pts:    512 pts_time:0.0333333 duration:512",
+        "[Parsed_showinfo_1 @ 0x55d0] n:   2 pts:   1024 pts_time:0.0666667",
+    ]
+
+    assert parse_showinfo_timestamps(stderr) == [0.0, 0.0333333, 0.0666667]
+
+
+def test_skips_unparseable_values():
+    stderr = ["[Parsed_showinfo_0 @ 0x1] n:0 pts:NOPTS pts_time:NOPTS duration:1"]
+
+    assert parse_showinfo_timestamps(stderr) == []
+
+
+def test_streams_timestamps_and_keeps_other_log_lines():
+    script = (
+        "import sys\n"
+        "for n in range(3):\n"
+        "    sys.stderr.write('[Parsed_showinfo_0 @ 0x1] n:%d pts_time:%d\\n' % (n, n))\n"
+        "sys.stderr.write('Conversion failed!\\n')\n"
+        "sys.exit(1)\n"
+    )
+
+    returncode, timestamps, log = run_ffmpeg_with_showinfo([sys.executable, "-c", script])
+
+    assert returncode == 1
+    assert timestamps == [0.0, 1.0, 2.0]
+    assert log == "Conversion failed!\n"
@@ -0,0 +1,20 @@
+import pytest
+
+from time_utils import time_to_seconds
+
+
+@pytest.mark.parametrize('time_str, expected', [
+    ('01:02:03', 3723),
+    ('02:03', 123),
+    ('45', 45),
+    ('00:01:00.5', 60.5),
+    ('00:00:10.05', 10.05),
+    ('00:00:10.500', 10.5),
+    (90, 90),
+])
+def test_time_to_seconds(time_str, expected):
+    assert time_to_seconds(time_str) == pytest.approx(expected)
+
+
+def test_invalid_time_string_returns_zero():
+    assert time_to_seconds('not a time') == 0
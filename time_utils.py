@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Clip Time Parsing for VLM Label
+
+This module parses the clip start/end times used in config.yaml, so the app's
+timeline offsets and the preprocessing that cuts the clips agree on them.
+"""
+
+import re
+
+# Clip times like 1:02:03.25, 02:03 or 3.5 ([[HH:]MM:]SS[.fraction])
+_TIME_RE = re.compile(r'^(?:(?:(\d+):)?(\d+):)?(\d+)(?:\.(\d+))?$')
+
+
+def time_to_seconds(time_str):
+    """Convert time string (HH:MM:SS.S) to seconds"""
+    # YAML turns unquoted values like 90 or 1:30 into numbers (1:30 -> 90)
+    if isinstance(time_str, (int, float)):
+        return time_str
+    
+    match = _TIME_RE.match(str(time_str).strip())
+    if not match:
+        print(f"Error parsing time string '{time_str}': expected [[HH:]MM:]SS[.fraction]")
+        return 0
+    
+    hours, minutes, seconds, fraction = match.groups()
+    total_seconds = int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(seconds)
+    if fraction:
+        # Scale by the digit count so .5, .50 and .500 all mean half a second
+        total_seconds += int(fraction) / 10 ** len(fraction)
+    return total_seconds